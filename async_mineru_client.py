@@ -0,0 +1,418 @@
+import os
+import time
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import aiohttp
+from dotenv import load_dotenv
+from http_session import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from mineru_client import MinerUClient
+
+# Maximum simultaneous HTTP connections held by one client
+DEFAULT_MAX_CONNECTIONS = 100
+
+# Errors that mean a status request should simply be retried on the next poll
+NETWORK_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class AsyncMinerUClient:
+    """
+    asyncio-native MinerU client built on aiohttp
+
+    Offers the same task methods as MinerUClient as coroutines, so thousands
+    of tasks can be created and awaited on a single event loop. It wraps a
+    MinerUClient and uses that client's tracker, lock and task store, so tasks
+    created or polled through either one are visible to both. Tracker updates
+    that write to the task store run on worker threads, never on the event loop.
+
+    Use it as an async context manager, or call close() when done.
+    """
+
+    def __init__(self, client: Optional[MinerUClient] = None,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS):
+        """
+        Args:
+            client: Client whose credentials, tracker and task store are used
+                (a MinerUClient for results/result.json if None)
+            max_connections: Maximum simultaneous HTTP connections
+        """
+        self.client = client or MinerUClient()
+        self.max_connections = max_connections
+        self.http_session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def requests_tracker(self) -> Dict[str, Dict]:
+        """The wrapped client's tracked requests"""
+        return self.client.requests_tracker
+
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Create the aiohttp session on first use, inside the running event loop"""
+        if self.http_session is None or self.http_session.closed:
+            load_dotenv()
+            timeout = aiohttp.ClientTimeout(
+                sock_connect=float(os.getenv('HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT)),
+                sock_read=float(os.getenv('HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT))
+            )
+            connector = aiohttp.TCPConnector(limit=self.max_connections)
+            self.http_session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self.http_session
+
+    async def close(self) -> None:
+        """Close the underlying HTTP session"""
+        if self.http_session is not None and not self.http_session.closed:
+            await self.http_session.close()
+
+    async def __aenter__(self) -> 'AsyncMinerUClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def create_task(self, url: str, name: str, is_ocr: bool = True,
+                          enable_formula: bool = True, enable_table: bool = True,
+                          language: str = 'en', course: Optional[str] = None) -> str:
+        """
+        Create a new extraction task
+
+        Args:
+            url: URL of the PDF to process
+            name: Custom name for tracking this request
+            is_ocr: Whether to perform OCR
+            enable_formula: Whether to extract formulas
+            enable_table: Whether to extract tables
+            language: Language of the document
+            course: Course schedule URL the PDF was scraped from, if any
+
+        Returns:
+            task_id: The ID of the created task
+        """
+        if name in self.client.requests_tracker:
+            print(f"Task {name} already exists with state: {self.client.get_state_description(self.client.requests_tracker[name]['state'])}")
+            return self.client.requests_tracker[name].get('task_id', '')
+
+        data = {
+            'url': url,
+            'is_ocr': is_ocr,
+            'enable_formula': enable_formula,
+            'enable_table': enable_table,
+            'language': language,
+        }
+        async with self._get_http_session().post(f"{self.client.base_url}/task", headers=self.client.headers, json=data) as response:
+            if response.status != 200:
+                raise Exception(f"Task request failed: {response.status} - {await response.text()}")
+            result = await response.json()
+
+        task_id = result["data"]["task_id"]
+        print(f"Created task {name} with ID: {task_id}")
+        await asyncio.to_thread(self.client.track_url_task, name, task_id, url, course)
+        return task_id
+
+    async def create_local_file_task(self, file_path: str, name: str = None, is_ocr: bool = True,
+                                     enable_formula: bool = True, enable_table: bool = True,
+                                     language: str = 'en') -> str:
+        """
+        Create a new extraction task for a local file
+
+        Returns:
+            batch_id: The ID of the created batch
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        name = name or os.path.basename(file_path)
+        if name in self.client.requests_tracker:
+            print(f"Task {name} already exists with state: {self.client.get_state_description(self.client.requests_tracker[name]['state'])}")
+            return self.client.requests_tracker[name].get('batch_id', '')
+
+        batch_ids = await self.create_local_file_tasks(
+            [(file_path, name)],
+            is_ocr=is_ocr,
+            enable_formula=enable_formula,
+            enable_table=enable_table,
+            language=language
+        )
+        return batch_ids[0]
+
+    async def create_tasks(self, slides: List[Dict], is_ocr: bool = True,
+                           enable_formula: bool = True, enable_table: bool = True,
+                           language: str = 'en') -> List[str]:
+        """
+        Create extraction tasks for several URLs using the batch endpoint
+
+        Batches of up to MAX_BATCH_SIZE files are submitted concurrently.
+
+        Args:
+            slides: List of dicts with 'url' and 'name' keys, and optionally 'course'
+
+        Returns:
+            List of batch_ids that were created
+        """
+        async def submit(chunk: List[Dict]) -> str:
+            data_ids = [self.client.make_data_id(slide['name'], i) for i, slide in enumerate(chunk)]
+            data = self.client.url_batch_data(chunk, data_ids, is_ocr, enable_formula, enable_table, language)
+            print(f"Creating batch task for {len(chunk)} URLs")
+            batch_id = (await self._post_batch(f"{self.client.base_url}/task/batch", data))["batch_id"]
+            print(f"Created batch with ID: {batch_id}")
+            await asyncio.to_thread(self.client.track_url_batch, batch_id, chunk, data_ids)
+            return batch_id
+
+        return list(await asyncio.gather(*(submit(chunk) for chunk in self.client.batch_chunks(self.client.untracked_slides(slides)))))
+
+    async def create_local_file_tasks(self, files: List[Tuple[str, Optional[str]]], is_ocr: bool = True,
+                                      enable_formula: bool = True, enable_table: bool = True,
+                                      language: str = 'en') -> List[str]:
+        """
+        Create extraction tasks for several local files using the batch endpoint
+
+        Args:
+            files: List of (file_path, name) tuples; name is auto-generated if None
+
+        Returns:
+            List of batch_ids that were created
+        """
+        batch_ids = []
+        for chunk in self.client.batch_chunks(self.client.untracked_local_files(files)):
+            data_ids = [self.client.make_data_id(name, i) for i, (_, name) in enumerate(chunk)]
+            data = self.client.upload_batch_data(chunk, data_ids, is_ocr, enable_formula, enable_table, language)
+
+            print(f"Requesting upload URLs for {len(chunk)} files")
+            result = await self._post_batch(self.client.upload_url, data)
+            batch_id = result["batch_id"]
+            file_urls = result["file_urls"]
+
+            if len(file_urls) != len(chunk):
+                raise Exception(f"Expected {len(chunk)} upload URLs, received {len(file_urls)}")
+
+            await self.upload_files([(file_path, upload_url) for (file_path, _), upload_url in zip(chunk, file_urls)])
+            print(f"Files uploaded successfully. Batch ID: {batch_id}")
+
+            await asyncio.to_thread(self.client.track_upload_batch, batch_id, chunk, data_ids)
+            batch_ids.append(batch_id)
+
+        return batch_ids
+
+    async def upload_files(self, uploads: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Upload local files to their presigned URLs, at most upload_workers at a time
+
+        Args:
+            uploads: List of (file_path, upload_url) tuples
+
+        Returns:
+            List of per-file upload stats (file_path, bytes, seconds, bytes_per_sec)
+        """
+        semaphore = asyncio.Semaphore(self.client.upload_workers)
+
+        async def upload(file_path: str, upload_url: str) -> Dict:
+            async with semaphore:
+                return await self._upload_file(file_path, upload_url)
+
+        outcomes = await asyncio.gather(*(upload(file_path, upload_url) for file_path, upload_url in uploads),
+                                        return_exceptions=True)
+        errors = [f"{file_path}: {str(outcome)}" for (file_path, _), outcome in zip(uploads, outcomes)
+                  if isinstance(outcome, Exception)]
+        if errors:
+            raise Exception(f"Failed to upload {len(errors)} file(s): {'; '.join(errors)}")
+
+        total_bytes = sum(stat['bytes'] for stat in outcomes)
+        print(f"Uploaded {len(outcomes)} files ({total_bytes / 1024 / 1024:.1f} MB)")
+        return outcomes
+
+    async def _upload_file(self, file_path: str, upload_url: str) -> Dict:
+        """Stream a single file to its presigned URL, retrying transient failures"""
+        size = os.path.getsize(file_path)
+
+        for attempt in range(1, self.client.upload_retries + 1):
+            start_time = time.time()
+            try:
+                with open(file_path, 'rb') as f:
+                    # The presigned URL is signed without a Content-Type, so don't let aiohttp add one
+                    async with self._get_http_session().put(upload_url, data=f,
+                                                            skip_auto_headers=['Content-Type']) as upload_response:
+                        status = upload_response.status
+
+                if status == 200:
+                    return self.client.upload_stats(file_path, size, start_time)
+                error = self.client.upload_status_error(status)
+
+            except NETWORK_ERRORS as e:
+                error = str(e) or type(e).__name__
+
+            delay = self.client.upload_retry_delay(file_path, attempt, error)
+            if delay is not None:
+                await asyncio.sleep(delay)
+
+        raise Exception(f"Failed to upload file after {self.client.upload_retries} attempts: {error}")
+
+    async def _post_batch(self, endpoint: str, data: Dict) -> Dict:
+        """POST a batch request and return its data payload"""
+        async with self._get_http_session().post(endpoint, headers=self.client.headers, json=data) as response:
+            if response.status != 200:
+                raise Exception(f"Batch request failed: {response.status} - {await response.text()}")
+            return self.client.batch_response_data(await response.json())
+
+    async def get_task_status(self, task_id: str) -> Dict:
+        """
+        Get the status of a task
+
+        Args:
+            task_id: The ID of the task to check
+
+        Returns:
+            Dict containing task status and data
+        """
+        await self.client.status_budget.acquire_async()
+        async with self._get_http_session().get(f"{self.client.base_url}/task/{task_id}", headers=self.client.headers) as response:
+            response.raise_for_status()
+            return (await response.json())["data"]
+
+    async def get_batch_status(self, batch_id: str) -> List[Dict]:
+        """
+        Get the status of a batch upload task
+
+        Args:
+            batch_id: The ID of the batch to check
+
+        Returns:
+            List of dictionaries containing task status and data
+        """
+        endpoint = f"{self.client.batch_results_url}/{batch_id}"
+        await self.client.status_budget.acquire_async()
+        async with self._get_http_session().get(endpoint, headers=self.client.headers) as response:
+            response.raise_for_status()
+            return (await response.json())["data"]["extract_result"]
+
+    async def get_batch_member_statuses(self, batch_id: str) -> Dict[str, Dict]:
+        """Get the status of every tracked member of a batch with a single request"""
+        return self.client.match_batch_members(batch_id, await self.get_batch_status(batch_id))
+
+    async def wait_for_task(self, name: str, timeout: int = 300, check_interval: Optional[float] = None) -> Dict:
+        """
+        Wait for a task to complete
+
+        Args:
+            name: Name of the tracked request
+            timeout: Maximum time to wait in seconds
+            check_interval: Fixed time between status checks in seconds
+                (None picks intervals adaptively from the task state and progress)
+
+        Returns:
+            Dict containing the final task result
+        """
+        async for _, result, error in self.wait_for_tasks([name], timeout=timeout, check_interval=check_interval):
+            if error is not None:
+                raise error
+            return result
+
+    async def wait_for_tasks(self, names: List[str], timeout: int = 300,
+                             check_interval: Optional[float] = None
+                             ) -> AsyncIterator[Tuple[str, Optional[Dict], Optional[Exception]]]:
+        """
+        Wait for several tasks at once, yielding each one as soon as it finishes
+
+        Uses the same scheduling as MinerUClient.wait_for_tasks, but all status
+        requests that are due in a cycle are sent concurrently.
+
+        Yields:
+            Tuples of (name, result, error); exactly one of result/error is set
+        """
+        finished, in_flight = self.client.partition_tasks(names)
+        for outcome in finished:
+            yield outcome
+
+        if not in_flight:
+            return
+
+        start_time = time.monotonic()
+        next_poll = {name: start_time for name in in_flight}
+        print(f"Waiting for {len(in_flight)} task(s) to complete...")
+
+        while in_flight:
+            due = self.client.due_tasks(in_flight, next_poll)
+
+            batch_cache: Dict[str, asyncio.Task] = {}
+            polls = await asyncio.gather(
+                *(self._poll_task(name, in_flight[name], batch_cache) for name in due),
+                return_exceptions=True
+            )
+            for name, poll in zip(due, polls):
+                if isinstance(poll, NETWORK_ERRORS):
+                    print(f"Network error checking status of {name}: {poll}")
+                    next_poll[name] = time.monotonic() + self.client.next_poll_interval(name, in_flight[name], None, check_interval)
+                    continue
+                if isinstance(poll, ValueError):
+                    del in_flight[name]
+                    yield name, None, poll
+                    continue
+                if isinstance(poll, BaseException):
+                    raise poll
+
+                current_state, status_data = poll
+                outcome = self.client.settle_poll(name, current_state, status_data, in_flight, next_poll, check_interval)
+                if outcome is not None:
+                    yield outcome
+
+            if not in_flight:
+                break
+
+            deadline = start_time + timeout
+            if time.monotonic() >= deadline:
+                for name in list(in_flight):
+                    self.client.polling_strategy.forget(name)
+                    yield name, None, TimeoutError(f"Task did not complete within {timeout} seconds")
+                break
+
+            wake_time = min(min(next_poll[name] for name in in_flight), deadline)
+            await asyncio.sleep(max(wake_time - time.monotonic(), 0))
+
+    async def _poll_task(self, name: str, last_state: Optional[str] = None,
+                         batch_cache: Optional[Dict[str, asyncio.Task]] = None) -> Tuple[str, Dict]:
+        """
+        Fetch the current status of a tracked task and update the tracker
+
+        Concurrent polls of members of the same batch share one in-flight
+        batch request through batch_cache.
+
+        Returns:
+            Tuple of (current_state, status_data)
+        """
+        request_info = self.client.requests_tracker[name]
+
+        if request_info.get('batch_id'):
+            batch_id = request_info['batch_id']
+            if batch_cache is None:
+                statuses = await self.get_batch_member_statuses(batch_id)
+            else:
+                if batch_id not in batch_cache:
+                    batch_cache[batch_id] = asyncio.ensure_future(self.get_batch_member_statuses(batch_id))
+                statuses = await batch_cache[batch_id]
+            status_data = statuses.get(name, {})
+        else:
+            task_id = request_info['task_id']
+            if not task_id:
+                raise ValueError(f"No task_id found for {name}")
+            status_data = await self.get_task_status(task_id)
+
+        # Saving a state change writes to the task store, so keep it off the event loop
+        current_state = await asyncio.to_thread(self.client.record_status, name, status_data, last_state)
+        return current_state, status_data
+
+
+# Example usage
+async def _example():
+    async with AsyncMinerUClient(MinerUClient()) as client:
+        slides = [
+            {
+                'url': f"https://courses.cs.washington.edu/courses/cse484/25sp/slides/cse484-lecture{i}-25sp.pdf",
+                'name': f"lecture{i}_slides"
+            }
+            for i in range(1, 4)
+        ]
+        await client.create_tasks(slides)
+        async for name, result, error in client.wait_for_tasks([slide['name'] for slide in slides]):
+            if error is not None:
+                print(f"Error for {name}: {error}")
+            else:
+                print(f"{name} completed: {result.get('full_zip_url')}")
+
+if __name__ == "__main__":
+    asyncio.run(_example())
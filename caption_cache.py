@@ -0,0 +1,83 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+from json_store import load_json, write_json_atomic
+
+DEFAULT_CACHE_FILE = 'results/caption_cache.json'
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def prompt_version(prompt: str) -> str:
+    """Short stable identifier of a prompt's text, so editing the prompt invalidates old captions"""
+    return hashlib.sha256(prompt.strip().encode('utf-8')).hexdigest()[:12]
+
+
+class CaptionCache:
+    """
+    Persistent image caption cache keyed by image content
+
+    Entries are keyed by the image's SHA-256 together with the model name and
+    prompt version, so identical images in different lectures are captioned
+    once. The cache is bounded to max_entries with least-recently-used
+    eviction and is safe to share between captioning threads.
+    """
+
+    def __init__(self, cache_file: str = DEFAULT_CACHE_FILE, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[str, str]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self) -> None:
+        """Load cached captions from disk"""
+        data = load_json(self.cache_file, {}, label='caption cache')
+        # Stored oldest first, so the file order is the LRU order
+        with self.lock:
+            self.entries = OrderedDict(data.get('entries', []))
+            self._evict()
+
+    def save(self) -> None:
+        """Write the cache to disk if it changed"""
+        with self.lock:
+            if not self.dirty:
+                return
+            data = {'entries': list(self.entries.items())}
+            self.dirty = False
+        write_json_atomic(self.cache_file, data, ensure_ascii=False)
+
+    @staticmethod
+    def make_key(image_hash: str, model: str, version: str) -> str:
+        """Cache key for an image's SHA-256, the captioning model and the prompt version"""
+        return f"{image_hash}:{model}:{version}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached caption for a key, marking it as recently used"""
+        with self.lock:
+            caption = self.entries.get(key)
+            if caption is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return caption
+
+    def put(self, key: str, caption: str) -> None:
+        """Store a caption, evicting the least recently used entries beyond max_entries"""
+        with self.lock:
+            self.entries[key] = caption
+            self.entries.move_to_end(key)
+            self._evict()
+            self.dirty = True
+
+    def _evict(self) -> None:
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.dirty = True
+
+    def __len__(self) -> int:
+        return len(self.entries)
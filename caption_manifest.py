@@ -0,0 +1,85 @@
+import os
+from typing import Dict, Optional
+from json_store import load_json, write_json_atomic
+
+# Sidecar written next to full.md recording what has been captioned
+CAPTION_MANIFEST_FILENAME = '.caption_manifest.json'
+
+
+def load_caption_manifest(directory_path) -> Optional[Dict]:
+    """Load the caption manifest of an output directory, or None if missing or unreadable"""
+    return load_json(os.path.join(directory_path, CAPTION_MANIFEST_FILENAME))
+
+
+def write_caption_manifest(directory_path, markdown_digest: str, model: str, version: str,
+                           images: Dict[str, Dict], complete: bool) -> None:
+    """
+    Record the captions generated for an output directory
+
+    Args:
+        directory_path: Output directory containing full.md
+        markdown_digest: SHA-256 of the full.md that was captioned
+        model: Model name used for the captions
+        version: Prompt version used for the captions
+        images: Mapping of image paths (as referenced in full.md) to their
+            size, mtime, sha256 and caption
+        complete: Whether every image that needed a caption got one
+    """
+    manifest = {
+        'markdown_sha256': markdown_digest,
+        'model': model,
+        'prompt_version': version,
+        'complete': complete,
+        'images': images
+    }
+    write_json_atomic(os.path.join(directory_path, CAPTION_MANIFEST_FILENAME), manifest,
+                      indent=4, ensure_ascii=False)
+
+
+def _matches(manifest: Optional[Dict], model: str, version: str) -> bool:
+    return (manifest is not None and manifest.get('model') == model
+            and manifest.get('prompt_version') == version)
+
+
+def image_unchanged(directory_path, image_path: str, record: Dict) -> bool:
+    """Whether an image still has the size and mtime recorded in the manifest"""
+    try:
+        stat = os.stat(os.path.join(directory_path, image_path))
+    except OSError:
+        return False
+    return stat.st_size == record.get('size') and stat.st_mtime == record.get('mtime')
+
+
+def is_fully_captioned(manifest: Optional[Dict], directory_path, markdown_digest: str,
+                       model: str, version: str) -> bool:
+    """
+    Check whether a directory's captioned.md is current
+
+    True when the manifest was written for this exact full.md, model and
+    prompt, every image was captioned, captioned.md exists and none of the
+    recorded images changed since.
+    """
+    if not _matches(manifest, model, version):
+        return False
+    if manifest.get('markdown_sha256') != markdown_digest or not manifest.get('complete'):
+        return False
+    if not os.path.exists(os.path.join(directory_path, 'captioned.md')):
+        return False
+    return all(image_unchanged(directory_path, image_path, record)
+               for image_path, record in manifest.get('images', {}).items())
+
+
+def recorded_caption(manifest: Optional[Dict], directory_path, image_path: str,
+                     model: str, version: str) -> Optional[Dict]:
+    """
+    Previously recorded entry for an image if the image is unchanged
+
+    Returns:
+        The image's manifest record (with 'caption' and 'sha256'), or None
+    """
+    if not _matches(manifest, model, version):
+        return None
+    record = manifest.get('images', {}).get(image_path)
+    if record and record.get('caption') and image_unchanged(directory_path, image_path, record):
+        return record
+    return None
@@ -0,0 +1,159 @@
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import requests
+from http_session import get_shared_session
+from json_store import load_json, write_json_atomic
+
+DEFAULT_CONTENT_INDEX_FILE = 'results/content_index.json'
+# PDFs hashed at once when checking a batch of slides
+DEFAULT_DIGEST_WORKERS = 8
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ContentIndex:
+    """
+    Index of converted PDFs keyed by the SHA-256 of their bytes
+
+    Three mappings are kept on disk:
+        urls:     PDF URL -> ETag, Last-Modified, size and sha256 of the last download
+        contents: sha256 -> name of the task whose results hold that PDF's conversion
+        aliases:  slide name -> name of the task whose results it reuses
+
+    The digest a task was created for is stored on the task itself
+    ('content_sha256'), so it only changes once a replacement task exists.
+
+    A PDF's digest is taken from the urls mapping when a HEAD request shows
+    the same validators as before; otherwise the PDF is streamed and hashed
+    without keeping it in memory.
+    """
+
+    def __init__(self, index_file: str = DEFAULT_CONTENT_INDEX_FILE,
+                 session: Optional[requests.Session] = None):
+        self.index_file = index_file
+        self.session = session or get_shared_session()
+        self.urls: Dict[str, Dict] = {}
+        self.contents: Dict[str, str] = {}
+        self.aliases: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Load the index from disk"""
+        data = load_json(self.index_file, {}, label='content index')
+        self.urls = data.get('urls', {})
+        self.contents = data.get('contents', {})
+        self.aliases = data.get('aliases', {})
+
+    def save(self) -> None:
+        """Write the index to disk"""
+        with self.lock:
+            write_json_atomic(self.index_file, {'urls': self.urls, 'contents': self.contents, 'aliases': self.aliases},
+                              indent=4, ensure_ascii=False)
+
+    @staticmethod
+    def _validators(headers) -> Dict:
+        return {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'size': int(headers['Content-Length']) if headers.get('Content-Length') else None
+        }
+
+    @staticmethod
+    def _same_resource(cached: Dict, current: Dict) -> bool:
+        """Whether HEAD validators show the PDF is unchanged since it was hashed"""
+        if current['etag'] and cached.get('etag'):
+            return current['etag'] == cached['etag']
+        if current['last_modified'] and current['size'] is not None:
+            return (current['last_modified'] == cached.get('last_modified')
+                    and current['size'] == cached.get('size'))
+        return False
+
+    def digest_url(self, url: str) -> str:
+        """
+        SHA-256 of the PDF at a URL
+
+        Args:
+            url: PDF URL
+
+        Returns:
+            Hex digest of the PDF bytes
+        """
+        with self.lock:
+            cached = self.urls.get(url)
+        if cached:
+            try:
+                response = self.session.head(url, allow_redirects=True)
+                if response.ok and self._same_resource(cached, self._validators(response.headers)):
+                    return cached['sha256']
+            except requests.RequestException:
+                pass  # Some hosts reject HEAD; hash the body instead
+
+        digest = hashlib.sha256()
+        with self.session.get(url, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=HASH_CHUNK_SIZE):
+                digest.update(chunk)
+            entry = self._validators(response.headers)
+        entry['sha256'] = digest.hexdigest()
+        with self.lock:
+            self.urls[url] = entry
+        return entry['sha256']
+
+    def digest_urls(self, urls: List[str], max_workers: int = DEFAULT_DIGEST_WORKERS) -> Dict[str, Optional[str]]:
+        """
+        Digest several PDFs concurrently
+
+        Returns:
+            Mapping of URL to hex digest, or None where the PDF could not be fetched
+        """
+        def digest(url: str) -> Optional[str]:
+            try:
+                return self.digest_url(url)
+            except Exception as e:
+                print(f"Error hashing {url}: {str(e)}")
+                return None
+
+        urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(urls, executor.map(digest, urls)))
+
+    def task_for_digest(self, digest: str) -> Optional[str]:
+        """Name of the task whose results hold the conversion of this content, if any"""
+        with self.lock:
+            return self.contents.get(digest)
+
+    def owner_of(self, name: str) -> Optional[str]:
+        """Name of the task whose results an alias reuses, or None if the name is not an alias"""
+        with self.lock:
+            return self.aliases.get(name)
+
+    def record_task(self, name: str, digest: str) -> None:
+        """Record that a task converts this content, dropping digests it no longer holds"""
+        with self.lock:
+            for stale in [old for old, owner in self.contents.items() if owner == name and old != digest]:
+                del self.contents[stale]
+            self.contents[digest] = name
+            self.aliases.pop(name, None)
+
+    def record_alias(self, name: str, owner: str) -> None:
+        """Record that a name reuses the results of the task that converted the same content"""
+        with self.lock:
+            self.aliases[name] = owner
+
+    def forget_task(self, name: str) -> List[str]:
+        """
+        Forget a deleted task: drop the digests it converted and the aliases reusing its results
+
+        Returns:
+            Names of the aliases that pointed at the task
+        """
+        with self.lock:
+            for digest in [digest for digest, owner in self.contents.items() if owner == name]:
+                del self.contents[digest]
+            orphans = [alias for alias, owner in self.aliases.items() if owner == name]
+            for alias in orphans:
+                del self.aliases[alias]
+            self.aliases.pop(name, None)
+            return orphans
@@ -0,0 +1,114 @@
+import os
+import hashlib
+from typing import Dict, Optional, Tuple
+import requests
+from json_store import load_json, write_json_atomic
+
+# Manifest file written into every extracted output directory
+MANIFEST_FILENAME = '.download_manifest.json'
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(extract_dir) -> Optional[Dict]:
+    """Load the download manifest of an output directory, or None if missing or unreadable"""
+    return load_json(os.path.join(extract_dir, MANIFEST_FILENAME))
+
+
+def write_manifest(extract_dir, zip_url: str, headers, artifacts: Optional[Tuple[str, ...]],
+                   files: Dict[str, Dict]) -> None:
+    """
+    Record what was downloaded into an output directory
+
+    Args:
+        extract_dir: Output directory the ZIP was extracted to
+        zip_url: URL of the result ZIP
+        headers: Response headers of the ZIP download (for ETag, Last-Modified and size)
+        artifacts: Artifact selection that was extracted (None for everything)
+        files: Mapping of extracted member names to their size and sha256
+    """
+    manifest = {
+        'zip_url': zip_url,
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified'),
+        'size': int(headers['Content-Length']) if headers.get('Content-Length') else None,
+        'artifacts': list(artifacts) if artifacts is not None else None,
+        'files': files
+    }
+    write_json_atomic(os.path.join(extract_dir, MANIFEST_FILENAME), manifest, indent=4)
+
+
+def files_intact(extract_dir, files: Dict[str, Dict], verify_hashes: bool = False) -> bool:
+    """Check that every recorded file still exists with its recorded size (and hash if requested)"""
+    for filename, record in files.items():
+        path = os.path.join(extract_dir, filename)
+        if not os.path.isfile(path) or os.path.getsize(path) != record['size']:
+            return False
+        if verify_hashes and file_digest(path) != record['sha256']:
+            return False
+    return True
+
+
+def covers_artifacts(manifest: Dict, artifacts: Optional[Tuple[str, ...]]) -> bool:
+    """Whether a previous download included every requested artifact"""
+    if manifest.get('artifacts') is None:
+        return True
+    if artifacts is None:
+        return False
+    return set(artifacts) <= set(manifest['artifacts'])
+
+
+def is_up_to_date(zip_url: str, extract_dir, artifacts: Optional[Tuple[str, ...]],
+                  session: Optional[requests.Session] = None, revalidate: bool = False,
+                  verify_hashes: bool = False) -> bool:
+    """
+    Check whether an output directory already holds this result ZIP's contents
+
+    MinerU result URLs are unique per task, so a matching URL with intact files
+    normally needs no request at all. With revalidate, a conditional HEAD
+    request (If-None-Match / If-Modified-Since) confirms the ZIP is unchanged.
+
+    Args:
+        zip_url: URL of the result ZIP
+        extract_dir: Output directory for this task
+        artifacts: Requested artifact selection (None for everything)
+        session: Session used for revalidation requests
+        revalidate: Confirm with the server using a conditional request
+        verify_hashes: Re-hash extracted files instead of only checking sizes
+
+    Returns:
+        True if the download can be skipped
+    """
+    manifest = load_manifest(extract_dir)
+    if manifest is None or manifest.get('zip_url') != zip_url:
+        return False
+    if not covers_artifacts(manifest, artifacts):
+        return False
+    if not files_intact(extract_dir, manifest.get('files', {}), verify_hashes):
+        return False
+    if not revalidate:
+        return True
+
+    conditional_headers = {}
+    if manifest.get('etag'):
+        conditional_headers['If-None-Match'] = manifest['etag']
+    if manifest.get('last_modified'):
+        conditional_headers['If-Modified-Since'] = manifest['last_modified']
+    if not conditional_headers:
+        return False
+
+    try:
+        response = session.head(zip_url, headers=conditional_headers, allow_redirects=True)
+    except requests.exceptions.RequestException:
+        return False
+    if response.status_code == 304:
+        return True
+    return (response.ok and manifest.get('etag') is not None
+            and response.headers.get('ETag') == manifest['etag'])
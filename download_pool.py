@@ -0,0 +1,154 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from zipper import download_and_extract_zip, DEFAULT_ARTIFACTS
+from download_manifest import is_up_to_date
+from http_session import get_shared_session
+
+DEFAULT_DOWNLOAD_WORKERS = 4
+DEFAULT_PER_HOST_LIMIT = 4
+
+
+class DownloadPool:
+    """
+    Download and extract result ZIPs on a bounded worker pool
+
+    Each worker downloads and then extracts its own ZIP, so one result's
+    extraction overlaps other results' network transfers. A per-host
+    semaphore caps concurrent downloads from any single server.
+    """
+
+    def __init__(self, workers: int = DEFAULT_DOWNLOAD_WORKERS, per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+                 artifacts: Optional[Tuple[str, ...]] = DEFAULT_ARTIFACTS, force: bool = False,
+                 revalidate: bool = False, verify_hashes: bool = False):
+        self.workers = workers
+        self.per_host_limit = per_host_limit
+        self.artifacts = artifacts
+        self.force = force
+        self.revalidate = revalidate
+        # Re-hash extracted files against the manifest before skipping a download
+        self.verify_hashes = verify_hashes
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='download')
+        self.host_limits: Dict[str, threading.Semaphore] = {}
+        self.lock = threading.Lock()
+        self.futures: List[Future] = []
+        self.results: List[Dict] = []
+        self.start_time: Optional[float] = None
+
+    def _host_limit(self, url: str) -> threading.Semaphore:
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.host_limits:
+                self.host_limits[host] = threading.Semaphore(self.per_host_limit)
+            return self.host_limits[host]
+
+    def submit(self, name: str, zip_url: str) -> Future:
+        """
+        Queue a result ZIP for download into output/<name>
+
+        Args:
+            name: Task name, used as the output directory name
+            zip_url: URL of the result ZIP
+
+        Returns:
+            Future resolving to a dict with the download outcome
+        """
+        if self.start_time is None:
+            self.start_time = time.time()
+        future = self.executor.submit(self._safe_download, name, zip_url)
+        self.futures.append(future)
+        return future
+
+    def _safe_download(self, name: str, zip_url: str) -> Dict:
+        """Run a download, reporting any error as a failed result instead of losing it in the future"""
+        try:
+            return self._download(name, zip_url)
+        except Exception as e:
+            print(f"Error downloading {name}: {str(e)}")
+            result = {'name': name, 'success': False, 'skipped': False, 'bytes': 0, 'seconds': 0.0}
+            with self.lock:
+                self.results.append(result)
+            return result
+
+    def _download(self, name: str, zip_url: str) -> Dict:
+        extract_dir = os.path.join('output', name)
+        if not self.force and is_up_to_date(zip_url, extract_dir, self.artifacts,
+                                            get_shared_session(), self.revalidate, self.verify_hashes):
+            print(f"Already up to date: {extract_dir}")
+            result = {'name': name, 'success': True, 'skipped': True, 'bytes': 0, 'seconds': 0.0}
+            with self.lock:
+                self.results.append(result)
+            return result
+
+        with self._host_limit(zip_url):
+            start_time = time.time()
+            print(f"Downloading results for: {name}")
+            extract_dir = download_and_extract_zip(zip_url, name, artifacts=self.artifacts, skip_unchanged=False)
+            elapsed = time.time() - start_time
+
+        result = {
+            'name': name,
+            'success': extract_dir is not None,
+            'skipped': False,
+            'bytes': _tree_size(extract_dir) if extract_dir is not None else 0,
+            'seconds': elapsed
+        }
+        if result['success']:
+            print(f"Results saved to: {extract_dir}")
+        with self.lock:
+            self.results.append(result)
+        return result
+
+    def wait(self) -> List[Dict]:
+        """
+        Wait for all queued downloads and print an aggregate throughput summary
+
+        Returns:
+            Outcomes of the downloads completed since the previous wait()
+        """
+        for future in self.futures:
+            # Workers report their own errors, so this only waits
+            future.exception()
+
+        with self.lock:
+            results, self.results = self.results, []
+        self.futures = []
+
+        if results:
+            elapsed = max(time.time() - self.start_time, 1e-6)
+            skipped = [result for result in results if result['skipped']]
+            downloaded = [result for result in results if result['success'] and not result['skipped']]
+            failed = [result for result in results if not result['success']]
+            total_bytes = sum(result['bytes'] for result in downloaded)
+            print(f"\nDownloaded {len(downloaded)}/{len(results) - len(skipped)} results "
+                  f"({total_bytes / 1024 / 1024:.1f} MB extracted) in {elapsed:.1f}s "
+                  f"({total_bytes / 1024 / 1024 / elapsed:.2f} MB/s with {self.workers} workers), "
+                  f"{len(skipped)} already up to date, {len(failed)} failed")
+        self.start_time = None
+        return results
+
+    def close(self) -> None:
+        """Wait for queued downloads and stop the workers"""
+        self.wait()
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'DownloadPool':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def _tree_size(path) -> int:
+    """Total size in bytes of the files under a directory"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
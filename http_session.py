@@ -0,0 +1,97 @@
+import os
+import threading
+from typing import Optional, Tuple, Union
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+# Connection pool defaults, overridable from .env
+DEFAULT_POOL_CONNECTIONS = 10   # Number of distinct hosts to keep pools for
+DEFAULT_POOL_MAXSIZE = 8        # Maximum open connections per host
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+
+# Status codes worth retrying on idempotent requests
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+class TimeoutSession(requests.Session):
+    """requests.Session that applies a default timeout to every request"""
+
+    def __init__(self, timeout: Union[float, Tuple[float, float]]):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def create_session(pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                   pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                   max_retries: int = DEFAULT_MAX_RETRIES,
+                   backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+                   timeout: Union[float, Tuple[float, float]] = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+                   ) -> requests.Session:
+    """
+    Create a keep-alive session with pooled connections, retries and timeouts
+
+    Args:
+        pool_connections: Number of per-host connection pools to cache
+        pool_maxsize: Maximum connections per host; extra requests block until one is free
+        max_retries: Retries for connection errors and retryable status codes
+        backoff_factor: Exponential backoff factor between retries
+        timeout: Default (connect, read) timeout applied to every request
+
+    Returns:
+        Configured requests.Session
+    """
+    # Only idempotent methods are retried here; POST task creation and
+    # streamed PUT uploads handle their own retries
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+        pool_block=True
+    )
+
+    session = TimeoutSession(timeout)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_shared_session() -> requests.Session:
+    """
+    Get the process-wide session shared by MinerUClient, zipper and SlideScraper
+
+    Pool sizes and timeouts can be configured in .env with HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE, HTTP_MAX_RETRIES, HTTP_CONNECT_TIMEOUT and HTTP_READ_TIMEOUT.
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            load_dotenv()
+            _shared_session = create_session(
+                pool_connections=int(os.getenv('HTTP_POOL_CONNECTIONS', DEFAULT_POOL_CONNECTIONS)),
+                pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', DEFAULT_POOL_MAXSIZE)),
+                max_retries=int(os.getenv('HTTP_MAX_RETRIES', DEFAULT_MAX_RETRIES)),
+                timeout=(
+                    float(os.getenv('HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT)),
+                    float(os.getenv('HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT))
+                )
+            )
+        return _shared_session
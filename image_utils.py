@@ -0,0 +1,111 @@
+import io
+from typing import Tuple
+from PIL import Image
+
+# Extensions of the images MinerU writes into output/<name>/images
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')
+
+# Longest side, in pixels, of images sent to the LLM
+DEFAULT_MAX_DIMENSION = 1024
+DEFAULT_JPEG_QUALITY = 85
+# Images with fewer pixels than this (icons, bullets, thin rules) are not worth captioning
+DEFAULT_MIN_AREA = 64 * 64
+
+# Formats that can be sent unchanged when they are already small enough
+_MIME_TYPES = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'WEBP': 'image/webp'}
+
+
+def is_image_file(path: str) -> bool:
+    """Whether a path looks like an image by its extension"""
+    return path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def dhash(image_path: str, hash_size: int = 8) -> int:
+    """
+    Difference hash of an image
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale grid and
+    each bit records whether a pixel is brighter than its right neighbour.
+    Re-encoded, slightly rescaled or recompressed copies of an image end up
+    within a few bits of each other.
+
+    Args:
+        image_path: Path to the image file
+        hash_size: Grid size; the hash has hash_size * hash_size bits
+
+    Returns:
+        Hash as an integer
+    """
+    with Image.open(image_path) as image:
+        small = image.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+        pixels = list(small.getdata())
+
+    bits = 0
+    width = hash_size + 1
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * width + col]
+            right = pixels[row * width + col + 1]
+            bits = (bits << 1) | (1 if left > right else 0)
+    return bits
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """Number of differing bits between two hashes"""
+    return bin(first ^ second).count('1')
+
+
+def image_size(image_path: str) -> Tuple[int, int]:
+    """Width and height of an image, read from its header without decoding the pixels"""
+    with Image.open(image_path) as image:
+        return image.size
+
+
+def is_trivial_image(image_path: str, min_area: int = DEFAULT_MIN_AREA) -> bool:
+    """Whether an image is too small to need a caption (icons, bullets, 1-pixel lines)"""
+    width, height = image_size(image_path)
+    return width * height < min_area
+
+
+def encode_for_llm(image_path: str, max_dimension: int = DEFAULT_MAX_DIMENSION,
+                   quality: int = DEFAULT_JPEG_QUALITY) -> Tuple[bytes, str]:
+    """
+    Downscale and re-encode an image for upload to an LLM
+
+    The image is shrunk so its longest side is at most max_dimension and
+    re-encoded as JPEG (transparent areas are flattened onto white). If the
+    original already fits and is smaller than the re-encoded version, the
+    original bytes are sent unchanged.
+
+    Args:
+        image_path: Path to the image file
+        max_dimension: Maximum width or height in pixels
+        quality: JPEG quality (1-95)
+
+    Returns:
+        Tuple of (image bytes, MIME type)
+    """
+    with open(image_path, 'rb') as f:
+        original = f.read()
+
+    with Image.open(io.BytesIO(original)) as image:
+        source_format = image.format
+        needs_resize = max(image.size) > max_dimension
+        # Let the JPEG decoder downscale while decoding instead of decoding full size
+        image.draft('RGB', (max_dimension, max_dimension))
+
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            image = image.convert('RGBA')
+            flattened = Image.new('RGB', image.size, 'white')
+            flattened.paste(image, mask=image.getchannel('A'))
+        else:
+            flattened = image.convert('RGB')
+
+    flattened.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    buffer = io.BytesIO()
+    flattened.save(buffer, 'JPEG', quality=quality, optimize=True)
+    encoded = buffer.getvalue()
+
+    if not needs_resize and source_format in _MIME_TYPES and len(original) <= len(encoded):
+        return original, _MIME_TYPES[source_format]
+    return encoded, 'image/jpeg'
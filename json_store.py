@@ -0,0 +1,51 @@
+import os
+import json
+from typing import Any, Optional
+
+
+def load_json(path: str, default: Any = None, label: Optional[str] = None) -> Any:
+    """
+    Load a JSON file
+
+    Args:
+        path: File to read
+        default: Returned when the file is missing or unreadable
+        label: Description for the warning printed on a corrupt or unreadable
+            file (e.g. 'caption cache'); None fails silently
+
+    Returns:
+        The parsed JSON, or default
+    """
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        if label:
+            print(f"Warning: Could not read {label} {path}: {str(e)}")
+        return default
+
+
+def write_json_atomic(path: str, data: Any, fsync: bool = False, **dump_options) -> None:
+    """
+    Write JSON to a temporary file and rename it over path
+
+    Readers see either the old or the new file, never a partial one.
+
+    Args:
+        path: File to write; its directory is created if needed
+        data: JSON-serializable data
+        fsync: Flush the file to disk before the rename
+        **dump_options: Passed to json.dump (e.g. indent, ensure_ascii)
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_options)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -1,10 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import os
-import time
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import google.generativeai as genai
-from PIL import Image
+from rate_limit import TokenBucket
+from caption_cache import CaptionCache, prompt_version
+from download_manifest import file_digest
+from perceptual_index import PerceptualIndex
+from caption_manifest import load_caption_manifest, write_caption_manifest, is_fully_captioned, recorded_caption
+from image_utils import DEFAULT_MAX_DIMENSION, DEFAULT_JPEG_QUALITY, DEFAULT_MIN_AREA, encode_for_llm, is_trivial_image
 
 class LLMClient(ABC):
     """Abstract base class for LLM clients"""
@@ -18,16 +25,31 @@ class LLMClient(ABC):
     def analyze_image(self, image_path: str, prompt: str) -> Optional[str]:
         """Analyze an image and return the response"""
         pass
+    
+    def analyze_images(self, image_paths: List[str], prompt: str) -> List[Optional[str]]:
+        """
+        Analyze several images with the same prompt
+        
+        Clients that can send several images in one request override this;
+        the default makes one analyze_image call per image.
+        
+        Returns:
+            One response per image, in the same order (None where analysis failed)
+        """
+        return [self.analyze_image(image_path, prompt) for image_path in image_paths]
 
 class GeminiClient(LLMClient):
     """Google Gemini implementation of LLM client"""
     
-    def __init__(self, model_name: str = 'gemini-2.0-flash-lite', rate_limit: int = 30):
+    def __init__(self, model_name: str = 'gemini-2.0-flash-lite', rate_limit: int = 30,
+                 max_dimension: int = DEFAULT_MAX_DIMENSION, jpeg_quality: int = DEFAULT_JPEG_QUALITY):
         self.model_name = model_name
         self.model = None
         self.rate_limit = rate_limit  # Requests per minute
-        self.request_count = 0
-        self.start_time = None
+        self.max_dimension = max_dimension
+        self.jpeg_quality = jpeg_quality
+        # Shared by every captioning worker, so concurrent requests still respect the quota
+        self.rate_limiter = TokenBucket(rate_limit)
         self.setup()
     
     def setup(self) -> None:
@@ -42,80 +64,231 @@ class GeminiClient(LLMClient):
     
     def _check_rate_limit(self) -> None:
         """Check and enforce rate limiting"""
-        current_time = time.time()
-        
-        # Initialize start time if this is the first request
-        if self.start_time is None:
-            self.start_time = current_time
-            self.request_count = 1
-            return
-        
-        # If we've hit the rate limit and it's been less than a minute
-        if self.request_count >= self.rate_limit:
-            elapsed_time = current_time - self.start_time
-            if elapsed_time < 60:  # Less than 1 minute
-                # Wait for the remaining time
-                wait_time = 60 - elapsed_time
-                print(f"Rate limit reached. Waiting {wait_time:.2f} seconds...")
-                time.sleep(wait_time)
-                # Reset counters
-                self.start_time = time.time()
-                self.request_count = 1
-            else:
-                # Reset counters if more than a minute has passed
-                self.start_time = current_time
-                self.request_count = 1
-        else:
-            # Increment request count
-            self.request_count += 1
+        wait_time = self.rate_limiter.acquire()
+        if wait_time > 1:
+            print(f"Rate limit reached. Waited {wait_time:.2f} seconds")
     
     def analyze_image(self, image_path: str, prompt: str) -> Optional[str]:
         """Analyze image using Gemini with rate limiting"""
         try:
+            # Downscale and re-encode before taking a rate limit token
+            data, mime_type = encode_for_llm(image_path, self.max_dimension, self.jpeg_quality)
+            
             # Check rate limit before making request
             self._check_rate_limit()
             
-            # Load and prepare the image
-            image = Image.open(image_path)
-            
             # Generate response
             response = self.model.generate_content(
-                [prompt, image],
+                [prompt, {'mime_type': mime_type, 'data': data}],
             )
             
             return response.text
         except Exception as e:
             print(f"Error analyzing image: {str(e)}")
             return None
+    
+    def analyze_images(self, image_paths: List[str], prompt: str) -> List[Optional[str]]:
+        """Analyze several images in a single Gemini request, falling back to one request per image"""
+        if len(image_paths) <= 1:
+            return [self.analyze_image(image_path, prompt) for image_path in image_paths]
+        
+        results: List[Optional[str]] = [None] * len(image_paths)
+        try:
+            # Each image is preceded by its id so the JSON response can be mapped back
+            contents = [_batch_prompt(prompt, len(image_paths))]
+            for image_id, image_path in enumerate(image_paths, start=1):
+                data, mime_type = encode_for_llm(image_path, self.max_dimension, self.jpeg_quality)
+                contents.append(f"Image {image_id}:")
+                contents.append({'mime_type': mime_type, 'data': data})
+            
+            self._check_rate_limit()
+            response = self.model.generate_content(
+                contents,
+                generation_config={'response_mime_type': 'application/json'},
+            )
+            parsed = _parse_batch_response(response.text, len(image_paths))
+            if parsed is None:
+                print(f"Could not parse batched response for {len(image_paths)} images, captioning them one by one")
+            else:
+                results = parsed
+        except Exception as e:
+            print(f"Error analyzing image batch: {str(e)}")
+        
+        # Anything the batch didn't answer gets its own request
+        for index, image_path in enumerate(image_paths):
+            if not results[index]:
+                results[index] = self.analyze_image(image_path, prompt)
+        return results
+
+def _batch_prompt(prompt: str, count: int) -> str:
+    """Wrap a single-image prompt with instructions for answering several images as JSON"""
+    return f"""{prompt.strip()}
+
+        You are given {count} images, each preceded by a line "Image <id>:".
+        Apply the instructions above to every image separately.
+        Respond with a JSON array containing one object per image: {{"id": <id>, "caption": "<caption>"}}.
+        """
+
+def _parse_batch_response(text: str, count: int) -> Optional[List[Optional[str]]]:
+    """
+    Map a batched JSON response back to image order
+    
+    Returns:
+        Captions by image position (None for images missing from the response),
+        or None if the response isn't the expected JSON
+    """
+    text = text.strip()
+    # Tolerate the response being wrapped in a markdown code fence
+    if text.startswith('```'):
+        text = text.strip('`')
+        if text.startswith('json'):
+            text = text[len('json'):]
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    
+    if isinstance(data, dict):
+        data = data.get('captions', data.get('images'))
+    if not isinstance(data, list):
+        return None
+    
+    captions: List[Optional[str]] = [None] * count
+    for item in data:
+        if not isinstance(item, dict):
+            return None
+        try:
+            image_id = int(item.get('id'))
+        except (TypeError, ValueError):
+            continue
+        caption = item.get('caption')
+        if 1 <= image_id <= count and isinstance(caption, str) and caption.strip():
+            captions[image_id - 1] = caption
+    return captions
+
+def write_with_replacements(content: str, replacements: List[Tuple[int, int, str]], output_path: str) -> None:
+    """
+    Write content to a file with spans replaced, in a single pass
+    
+    The unchanged text between spans and the replacement text are streamed
+    to the file in order, so the document is never rebuilt in memory. The
+    file is written to a temporary path and moved into place.
+    
+    Args:
+        content: Original document text
+        replacements: (start, end, text) tuples sorted by start, non-overlapping
+        output_path: File to write
+    """
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        position = 0
+        for start, end, text in replacements:
+            f.write(content[position:start])
+            f.write(text)
+            position = end
+        f.write(content[position:])
+    os.replace(tmp_path, output_path)
 
 class ImageCaptionAgent:
     """Agent for generating image captions in markdown files"""
     
-    def __init__(self, llm_client: LLMClient):
+    def __init__(self, llm_client: LLMClient, max_workers: int = 1, cache: Optional[CaptionCache] = None,
+                 perceptual_index: Optional[PerceptualIndex] = None, min_image_area: int = DEFAULT_MIN_AREA,
+                 batch_size: int = 1):
         self.llm_client = llm_client
+        self.max_workers = max_workers
+        # Number of images sent per LLM request (1 disables batching)
+        self.batch_size = batch_size
+        self.min_image_area = min_image_area
+        self.cache = cache
+        # Near-duplicate lookups only make sense with a cache to reuse captions from
+        self.perceptual_index = perceptual_index if cache is not None else None
         self.image_prompt = """
         Analyze this image from a computer security lecture slide. Write a short and concise caption for the image that is use for accessibility (alt text for image).
 
         Give back only the caption, no other text, no markdown formatting, no code block, no code, no nothing.
         """
+        self.model_name = getattr(llm_client, 'model_name', type(llm_client).__name__)
+        self.prompt_version = prompt_version(self.image_prompt)
+    
+    def _cached_caption(self, full_image_path: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Look up a caption for an identical or near-identical image
+        
+        Returns:
+            Tuple of (cache key, cached caption or None); the key is None without a cache
+        """
+        if self.cache is None:
+            return None, None
+        
+        entry = self.perceptual_index.add(full_image_path) if self.perceptual_index is not None else None
+        image_hash = entry['sha256'] if entry else file_digest(full_image_path)
+        key = self.cache.make_key(image_hash, self.model_name, self.prompt_version)
+        caption = self.cache.get(key)
+        if caption is not None:
+            print(f"Reusing cached caption for: {full_image_path}")
+            return key, caption
+        
+        if entry:
+            for distance, similar_hash in self.perceptual_index.find_similar(entry):
+                caption = self.cache.get(self.cache.make_key(similar_hash, self.model_name, self.prompt_version))
+                if caption is not None:
+                    print(f"Reusing caption of a near-duplicate image (distance {distance}) for: {full_image_path}")
+                    self.cache.put(key, caption)
+                    return key, caption
+        return key, None
     
-    def process_directory(self, directory_path: str) -> None:
-        """Process all images in a directory and update markdown"""
+    def _caption_images(self, full_image_paths: List[str]) -> List[Optional[str]]:
+        """Generate captions for a batch of images, sending only cache misses to the LLM in one request"""
+        lookups = [self._cached_caption(full_image_path) for full_image_path in full_image_paths]
+        captions = [caption for _, caption in lookups]
+        missing = [index for index, caption in enumerate(captions) if caption is None]
+        if not missing:
+            return captions
+        
+        missing_paths = [full_image_paths[index] for index in missing]
+        if len(missing_paths) == 1:
+            generated = [self.llm_client.analyze_image(missing_paths[0], self.image_prompt)]
+        else:
+            generated = self.llm_client.analyze_images(missing_paths, self.image_prompt)
+        
+        for index, caption in zip(missing, generated):
+            captions[index] = caption
+            key = lookups[index][0]
+            if caption and key is not None:
+                self.cache.put(key, caption)
+        return captions
+    
+    def process_directory(self, directory_path: str, force: bool = False) -> None:
+        """
+        Process all images in a directory and update markdown
+        
+        Directories whose captioned.md is current according to the caption
+        manifest are skipped, and images captioned on a previous run are
+        reused, so only new or changed images reach the LLM.
+        
+        Args:
+            directory_path: Output directory containing full.md
+            force: Ignore the caption manifest and caption every image again
+        """
         # Read the original markdown
         md_path = os.path.join(directory_path, 'full.md')
         if not os.path.exists(md_path):
             raise FileNotFoundError(f"Markdown file not found: {md_path}")
         
+        markdown_digest = file_digest(md_path)
+        manifest = None if force else load_caption_manifest(directory_path)
+        if is_fully_captioned(manifest, directory_path, markdown_digest, self.model_name, self.prompt_version):
+            print(f"Already captioned: {directory_path}")
+            return
+        
         with open(md_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # Find all image references
-        import re
+        # Find all image references that still need a caption
         image_pattern = r'!\[(.*?)\]\((.*?)\)'
-        image_matches = re.finditer(image_pattern, content)
-        
-        # Process each image
-        for match in image_matches:
+        pending = []
+        for match in re.finditer(image_pattern, content):
             alt_text = match.group(1)
             image_path = match.group(2)
             
@@ -129,32 +302,99 @@ class ImageCaptionAgent:
                 print(f"Warning: Image not found: {full_image_path}")
                 continue
             
-            # Generate caption
-            print(f"Processing image: {image_path}")
-            caption = self.llm_client.analyze_image(full_image_path, self.image_prompt)
+            # Skip icons, bullets and thin rules that aren't worth a request
+            try:
+                if is_trivial_image(full_image_path, self.min_image_area):
+                    print(f"Skipping small image: {image_path}")
+                    continue
+            except OSError as e:
+                print(f"Warning: Could not read image {full_image_path}: {str(e)}")
+                continue
             
+            pending.append((match, full_image_path))
+        
+        # Reuse captions recorded on a previous run for unchanged images
+        records = {}
+        to_caption = []
+        for match, full_image_path in pending:
+            image_path = match.group(2)
+            if image_path in records:
+                continue
+            record = recorded_caption(manifest, directory_path, image_path, self.model_name, self.prompt_version)
+            if record is not None:
+                records[image_path] = record
+            else:
+                records[image_path] = None
+                to_caption.append((image_path, full_image_path))
+        
+        # Generate captions; map() returns them in document order even when run concurrently
+        print(f"Captioning {len(to_caption)} of {len(pending)} images with {self.max_workers} worker(s), "
+              f"up to {self.batch_size} image(s) per request")
+        full_image_paths = [full_image_path for _, full_image_path in to_caption]
+        batches = [full_image_paths[i:i + self.batch_size] for i in range(0, len(full_image_paths), self.batch_size)]
+        if self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                batch_captions = list(executor.map(self._caption_images, batches))
+        else:
+            batch_captions = [self._caption_images(batch) for batch in batches]
+        captions = [caption for batch in batch_captions for caption in batch]
+        
+        for (image_path, full_image_path), caption in zip(to_caption, captions):
             if caption:
-                # Update the markdown content
-                new_alt_text = caption.strip()
-                content = content.replace(match.group(0), f'![{new_alt_text}]({image_path})')
-                print(f"Generated caption: {new_alt_text}")
+                stat = os.stat(full_image_path)
+                records[image_path] = {
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime,
+                    'sha256': file_digest(full_image_path),
+                    'caption': caption
+                }
+        
+        # Collect replacements by match span, in document order
+        replacements = []
+        for match, _ in pending:
+            image_path = match.group(2)
+            record = records[image_path]
+            if record:
+                new_alt_text = record['caption'].strip()
+                replacements.append((match.start(), match.end(), f'![{new_alt_text}]({image_path})'))
+                print(f"Generated caption for {image_path}: {new_alt_text}")
             else:
                 print(f"Failed to generate caption for: {image_path}")
         
+        if self.cache is not None:
+            self.cache.save()
+            print(f"Caption cache: {self.cache.hits} hits, {self.cache.misses} misses, {len(self.cache)} entries")
+        if self.perceptual_index is not None:
+            self.perceptual_index.save()
+        
         # Write the updated content
         output_path = os.path.join(directory_path, 'captioned.md')
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        write_with_replacements(content, replacements, output_path)
+        
+        # Record what was captioned; a failed image leaves the directory incomplete so the next run retries it
+        captioned = {image_path: record for image_path, record in records.items() if record}
+        write_caption_manifest(directory_path, markdown_digest, self.model_name, self.prompt_version,
+                               captioned, complete=len(captioned) == len(records))
         
         print(f"\nUpdated markdown saved to: {output_path}")
 
-def main():
+def main(near_duplicates: bool = False):
     # Example usage
     llm_client = GeminiClient()
-    agent = ImageCaptionAgent(llm_client)
 
     dirs = "output/"
+    perceptual_index = None
+    if near_duplicates:
+        # Index every extracted image up front so near-duplicates across lectures can share captions
+        perceptual_index = PerceptualIndex()
+        print(f"Indexed {perceptual_index.build(dirs)} images for near-duplicate detection")
+    agent = ImageCaptionAgent(llm_client, max_workers=4, cache=CaptionCache(), perceptual_index=perceptual_index,
+                              batch_size=5)
+
     for dir in os.listdir(dirs):
+        # Skip bookkeeping directories such as output/.partial
+        if dir.startswith('.'):
+            continue
         directory_path = os.path.join(dirs, dir)
         agent.process_directory(directory_path)
     
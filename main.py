@@ -3,10 +3,31 @@ import os
 import sys
 import shutil
 from datetime import datetime
-from typing import List, Dict, Optional
-from slide_scraper import SlideScraper
+from typing import List, Dict, Optional, Tuple
+from slide_scraper import (CourseCrawler, DEFAULT_CRAWL_WORKERS, DEFAULT_PER_HOST_DELAY,
+                           LINK_PARSERS, DEFAULT_LINK_PARSER)
+from page_cache import PageCache
+from content_index import ContentIndex
 from mineru_client import MinerUClient, TaskState
-from zipper import download_and_extract_zip
+from zipper import ARTIFACTS, DEFAULT_ARTIFACTS
+from download_pool import DownloadPool, DEFAULT_DOWNLOAD_WORKERS, DEFAULT_PER_HOST_LIMIT
+from llm_client import GeminiClient, ImageCaptionAgent
+from caption_cache import CaptionCache
+from perceptual_index import PerceptualIndex
+from pipeline import SlidePipeline
+
+
+def parse_artifacts(value: str) -> Optional[Tuple[str, ...]]:
+    """Parse a comma-separated artifact list; 'all' selects every ZIP member"""
+    if value.strip().lower() == 'all':
+        return None
+    artifacts = tuple(item.strip() for item in value.split(',') if item.strip())
+    unknown = [item for item in artifacts if item not in ARTIFACTS]
+    if unknown or not artifacts:
+        raise argparse.ArgumentTypeError(
+            f"Invalid artifacts: {value} (choose from {', '.join(ARTIFACTS)} or 'all')"
+        )
+    return artifacts
 
 
 def setup_argument_parser() -> argparse.ArgumentParser:
@@ -19,6 +40,8 @@ Examples:
   # Course scraping
   python main.py --interactive
   python main.py --url "https://example.com/schedule/" --keyword "lecture"
+  python main.py --url "https://a.edu/schedule/" "https://b.edu/schedule/"
+  python main.py --urls-file courses.txt --keyword "slides"
   
   # Single PDF processing
   python main.py --pdf-url "https://example.com/file.pdf"
@@ -27,6 +50,10 @@ Examples:
   # Local file processing
   python main.py --local-file "document.pdf"
   python main.py --local-interactive
+  python main.py --local-dir "slides/"
+  
+  # Caption images as soon as each deck is downloaded
+  python main.py --url "https://example.com/schedule/" --caption
   
   # Cache management
   python main.py --cache-list
@@ -36,8 +63,22 @@ Examples:
     
     # Course processing options
     course_group = parser.add_argument_group('Course Processing')
-    course_group.add_argument('--url', '-u', type=str, help='Course schedule URL to scrape slides from')
+    course_group.add_argument('--url', '-u', type=str, nargs='+',
+                             help='Course schedule URL(s) to scrape slides from')
+    course_group.add_argument('--urls-file', type=str,
+                             help='File with one course schedule URL per line (# starts a comment)')
+    course_group.add_argument('--crawl-workers', type=int, default=DEFAULT_CRAWL_WORKERS,
+                             help=f'Schedule pages to fetch in parallel when crawling several courses (default: {DEFAULT_CRAWL_WORKERS})')
+    course_group.add_argument('--crawl-delay', type=float, default=DEFAULT_PER_HOST_DELAY,
+                             help=f'Minimum seconds between requests to the same host when crawling (default: {DEFAULT_PER_HOST_DELAY})')
     course_group.add_argument('--keyword', '-k', type=str, help='Keyword to filter slides (e.g., "slides", "lecture")')
+    course_group.add_argument('--no-page-cache', action='store_true',
+                             help='Always re-download and re-parse schedule pages instead of using conditional requests')
+    course_group.add_argument('--no-content-index', action='store_true',
+                             help='Decide which slides to convert by name only, without hashing the PDFs')
+    course_group.add_argument('--link-parser', choices=LINK_PARSERS, default=DEFAULT_LINK_PARSER,
+                             help=f'How to extract links from schedule pages: "soup" builds a full BeautifulSoup tree, '
+                                  f'"stream" parses the page incrementally while it downloads (default: {DEFAULT_LINK_PARSER})')
     course_group.add_argument('--interactive', '-i', action='store_true', 
                              help='Run in interactive mode (prompts for course URL input)')
     
@@ -54,6 +95,8 @@ Examples:
     local_group.add_argument('--local-name', type=str, help='Custom name for the local file')
     local_group.add_argument('--local-interactive', action='store_true',
                             help='Run in interactive mode for local file processing')
+    local_group.add_argument('--local-dir', type=str,
+                            help='Path to a directory of PDF files to process as one batch')
     
     # State management options
     state_group = parser.add_argument_group('State Management')
@@ -63,6 +106,29 @@ Examples:
                             help='Only download results for previously processed slides')
     state_group.add_argument('--skip-processing', action='store_true',
                             help='Skip processing new slides, only download existing results')
+    state_group.add_argument('--artifacts', type=parse_artifacts, default=DEFAULT_ARTIFACTS,
+                            help=f"Comma-separated result artifacts to download ({', '.join(ARTIFACTS)}) "
+                                 f"or 'all' (default: {','.join(DEFAULT_ARTIFACTS)})")
+    state_group.add_argument('--download-workers', type=int, default=DEFAULT_DOWNLOAD_WORKERS,
+                            help=f'Number of result ZIPs to download in parallel (default: {DEFAULT_DOWNLOAD_WORKERS})')
+    state_group.add_argument('--force-download', action='store_true',
+                            help='Re-download results even if the output directory is up to date')
+    state_group.add_argument('--revalidate', action='store_true',
+                            help='Confirm unchanged results with a conditional request before skipping them')
+    state_group.add_argument('--verify-downloads', action='store_true',
+                            help='Re-hash extracted files against their download manifest before skipping them')
+    state_group.add_argument('--per-host-downloads', type=int, default=DEFAULT_PER_HOST_LIMIT,
+                            help=f'Maximum parallel downloads from one host (default: {DEFAULT_PER_HOST_LIMIT})')
+    
+    # Captioning options
+    caption_group = parser.add_argument_group('Captioning')
+    caption_group.add_argument('--caption', action='store_true',
+                              help='Caption images with Gemini as each result is downloaded (course and --local-dir modes)')
+    caption_group.add_argument('--caption-workers', type=int, default=4,
+                              help='Number of caption requests to run in parallel (default: 4)')
+    caption_group.add_argument('--caption-near-duplicates', action='store_true',
+                              help='Reuse the caption of a visually near-identical image (re-encoded copy) '
+                                   'instead of captioning it again')
     
     # Cache management options
     cache_group = parser.add_argument_group('Cache Management')
@@ -80,9 +146,10 @@ def validate_arguments(args) -> None:
     """Validate command line arguments for conflicts and requirements"""
     # Count the number of main modes selected
     main_modes = [
-        args.url or args.interactive,
+        args.url or args.urls_file or args.interactive,
         args.pdf_url or args.pdf_interactive,
         args.local_file or args.local_interactive,
+        args.local_dir,
         args.download_only or args.skip_processing,
         args.cache_list or args.cache_interactive or args.cache_clean
     ]
@@ -106,14 +173,26 @@ def validate_arguments(args) -> None:
         print("Error: --local-name can only be used with --local-file")
         sys.exit(2)
     
-    if args.keyword and not (args.url or args.interactive):
-        print("Error: --keyword can only be used with course scraping (--url or --interactive)")
+    if args.keyword and not (args.url or args.urls_file or args.interactive):
+        print("Error: --keyword can only be used with course scraping (--url, --urls-file or --interactive)")
         sys.exit(2)
     
     # Validate local file exists
     if args.local_file and not os.path.exists(args.local_file):
         print(f"Error: Local file not found: {args.local_file}")
         sys.exit(2)
+    
+    if args.caption and not (args.url or args.urls_file or args.interactive or args.local_dir):
+        print("Error: --caption can only be used with course scraping (--url, --urls-file or --interactive) or --local-dir")
+        sys.exit(2)
+    
+    if args.urls_file and not os.path.exists(args.urls_file):
+        print(f"Error: URLs file not found: {args.urls_file}")
+        sys.exit(2)
+    
+    if args.local_dir and not os.path.isdir(args.local_dir):
+        print(f"Error: Local directory not found: {args.local_dir}")
+        sys.exit(2)
 
 
 def get_course_input() -> tuple[str, Optional[str]]:
@@ -246,7 +325,36 @@ def process_local_file(client: MinerUClient, file_path: str, local_name: Optiona
         print(f"Error processing local file: {str(e)}")
 
 
-def download_results(client: MinerUClient) -> None:
+def process_local_directory(client: MinerUClient, directory: str, pool: DownloadPool,
+                            caption_agent: Optional[ImageCaptionAgent] = None) -> None:
+    """Process every PDF file in a local directory as a single batch"""
+    pdf_files = sorted(
+        os.path.join(directory, filename)
+        for filename in os.listdir(directory)
+        if filename.lower().endswith('.pdf')
+    )
+    
+    if not pdf_files:
+        print(f"No PDF files found in: {directory}")
+        return
+    
+    print(f"\nProcessing {len(pdf_files)} local files from: {directory}")
+    
+    # Upload, wait, download and caption as overlapping stages
+    pipeline = SlidePipeline(client, pool, caption_agent)
+    pipeline.run_local_files([(file_path, None) for file_path in pdf_files])
+
+
+def download_task_result(pool: DownloadPool, task: Dict) -> None:
+    """Queue the result ZIP of a single completed task for download"""
+    if task['result'] and 'full_zip_url' in task['result']:
+        # Pass just the task name - zipper.py will create output/{task_name} automatically
+        pool.submit(task['name'], task['result']['full_zip_url'])
+    else:
+        print(f"No download URL available for: {task['name']}")
+
+
+def download_results(client: MinerUClient, pool: DownloadPool) -> None:
     """Download results for completed tasks"""
     completed_tasks = client.get_completed_tasks()
     
@@ -257,20 +365,9 @@ def download_results(client: MinerUClient) -> None:
     print(f"Found {len(completed_tasks)} completed tasks to download.")
     
     for task in completed_tasks:
-        try:
-            if task['result'] and 'full_zip_url' in task['result']:
-                zip_url = task['result']['full_zip_url']
-                # Pass just the task name - zipper.py will create output/{task_name} automatically
-                task_name = task['name']
-                
-                print(f"Downloading results for: {task_name}")
-                download_and_extract_zip(zip_url, task_name)
-                print(f"Results saved to: output/{task_name}")
-            else:
-                print(f"No download URL available for: {task['name']}")
-                
-        except Exception as e:
-            print(f"Error downloading {task['name']}: {str(e)}")
+        download_task_result(pool, task)
+    
+    pool.wait()
 
 
 def get_directory_size(path: str) -> int:
@@ -306,7 +403,7 @@ def format_timestamp(timestamp: float) -> str:
 
 def list_cached_files(client: MinerUClient) -> List[Dict]:
     """List all cached files with their information"""
-    cached_files = client.get_tracked_requests()
+    cached_files = client.query_tasks()
     
     if not cached_files:
         print("No cached files found.")
@@ -334,24 +431,36 @@ def list_cached_files(client: MinerUClient) -> List[Dict]:
     return cached_files
 
 
-def delete_cached_file(client: MinerUClient, file_info: Dict) -> bool:
-    """Delete a cached file and its output directory"""
+def delete_cached_file(client: MinerUClient, file_info: Dict, content_index: Optional[ContentIndex] = None) -> bool:
+    """Delete a cached file and its output directory, and forget the content it converted"""
     name = file_info['name']
     
     try:
         # Remove from results tracker
         if name in client.requests_tracker:
-            del client.requests_tracker[name]
+            client.delete_task(name)
             print(f"Removed '{name}' from results cache")
         
+        # Slides that reused this task's results are converted on their own next time
+        orphans = []
+        if content_index is not None:
+            orphans = content_index.forget_task(name)
+            content_index.save()
+        for alias in orphans:
+            alias_dir = f"output/{alias}"
+            if os.path.islink(alias_dir):
+                os.unlink(alias_dir)
+                print(f"Removed link: {alias_dir}")
+        
         # Delete output directory
         output_dir = f"output/{name}"
-        if os.path.exists(output_dir):
+        if os.path.islink(output_dir):
+            os.unlink(output_dir)
+            print(f"Removed link: {output_dir}")
+        elif os.path.exists(output_dir):
             shutil.rmtree(output_dir)
             print(f"Deleted output directory: {output_dir}")
         
-        # Save updated state
-        client.save_current_state()
         return True
         
     except Exception as e:
@@ -380,7 +489,7 @@ def parse_range(range_str: str, max_num: int) -> List[int]:
         raise ValueError(f"Invalid range format: {range_str}")
 
 
-def interactive_cache_management(client: MinerUClient) -> None:
+def interactive_cache_management(client: MinerUClient, content_index: Optional[ContentIndex] = None) -> None:
     """Interactive cache management interface"""
     while True:
         cached_files = list_cached_files(client)
@@ -408,7 +517,7 @@ def interactive_cache_management(client: MinerUClient) -> None:
             if confirm == 'yes':
                 deleted_count = 0
                 for file_info in cached_files:
-                    if delete_cached_file(client, file_info):
+                    if delete_cached_file(client, file_info, content_index):
                         deleted_count += 1
                 print(f"Deleted {deleted_count} cached files.")
             else:
@@ -430,7 +539,7 @@ def interactive_cache_management(client: MinerUClient) -> None:
                     if confirm == 'yes':
                         deleted_count = 0
                         for file_info in files_to_delete:
-                            if delete_cached_file(client, file_info):
+                            if delete_cached_file(client, file_info, content_index):
                                 deleted_count += 1
                         print(f"Deleted {deleted_count} files.")
                     else:
@@ -444,7 +553,7 @@ def interactive_cache_management(client: MinerUClient) -> None:
                 print("Invalid selection number.")
 
 
-def clean_all_cache(client: MinerUClient) -> None:
+def clean_all_cache(client: MinerUClient, content_index: Optional[ContentIndex] = None) -> None:
     """Clean all cached files with confirmation"""
     cached_files = client.get_tracked_requests()
     
@@ -461,79 +570,190 @@ def clean_all_cache(client: MinerUClient) -> None:
     
     deleted_count = 0
     for file_info in cached_files:
-        if delete_cached_file(client, file_info):
+        if delete_cached_file(client, file_info, content_index):
             deleted_count += 1
     
     print(f"All cache cleaned. Removed {deleted_count} files.")
 
 
-def process_course_slides(client: MinerUClient, url: str, keyword: Optional[str] = None) -> None:
+def process_course_slides(client: MinerUClient, url: str, pool: DownloadPool,
+                          keyword: Optional[str] = None, caption_agent: Optional[ImageCaptionAgent] = None,
+                          page_cache: Optional[PageCache] = None, link_parser: str = DEFAULT_LINK_PARSER,
+                          content_index: Optional[ContentIndex] = None) -> None:
     """Process slides from a course website"""
-    print(f"\nScraping slides from: {url}")
+    # Crawled like any other course, so slide names don't change when more courses are added to the run
+    process_courses(client, [url], pool, keyword, caption_agent, page_cache=page_cache,
+                    link_parser=link_parser, content_index=content_index)
+
+
+def process_courses(client: MinerUClient, urls: List[str], pool: DownloadPool, keyword: Optional[str] = None,
+                    caption_agent: Optional[ImageCaptionAgent] = None, crawl_workers: int = DEFAULT_CRAWL_WORKERS,
+                    crawl_delay: float = DEFAULT_PER_HOST_DELAY, page_cache: Optional[PageCache] = None,
+                    link_parser: str = DEFAULT_LINK_PARSER, content_index: Optional[ContentIndex] = None) -> None:
+    """Crawl one or more course websites concurrently and process their slides as one run"""
+    print(f"\nCrawling {len(urls)} course schedule{'s' if len(urls) != 1 else ''}")
     if keyword:
         print(f"Filtering by keyword: {keyword}")
     
-    # Initialize the slide scraper
-    scraper = SlideScraper()
-    
-    # Scrape for slides
-    slides = scraper.get_slides(url, keyword)
+    crawler = CourseCrawler(max_workers=crawl_workers, per_host_delay=crawl_delay, page_cache=page_cache,
+                            link_parser=link_parser)
+    slides = crawler.crawl(urls, keyword)
     
     if not slides:
         print("No slides found.")
         return
     
-    print(f"Found {len(slides)} slides to process.")
-    
+    process_slides(client, slides, pool, caption_agent, links_changed=bool(crawler.changed_courses),
+                   content_index=content_index)
+
+
+def read_urls_file(path: str) -> List[str]:
+    """Read course URLs from a file, one per line, ignoring blank lines and # comments"""
+    urls = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                urls.append(line)
+    return urls
+
+
+def process_slides(client: MinerUClient, slides: List[Dict], pool: DownloadPool,
+                   caption_agent: Optional[ImageCaptionAgent] = None, links_changed: bool = True,
+                   content_index: Optional[ContentIndex] = None) -> None:
+    """Convert scraped slides that haven't been processed yet, downloading and captioning the results"""
+    # Nothing to submit when the schedule pages are unchanged and every slide is already tracked or an alias,
+    # but results that failed to download on an earlier run are still fetched below
+    if not links_changed and all(
+        slide['name'] in client.requests_tracker
+        or (content_index is not None and content_index.owner_of(slide['name']) is not None)
+        for slide in slides
+    ):
+        print("Schedule pages are unchanged since the last run.")
+        new_slides = []
     # Check which slides are already processed
-    existing_requests = client.get_tracked_requests()
-    existing_names = {req['name'] for req in existing_requests}
-    
-    new_slides = []
-    for slide in slides:
-        if slide['name'] not in existing_names:
-            new_slides.append(slide)
-        else:
-            print(f"Skipping already processed: {slide['name']}")
+    elif content_index is not None:
+        new_slides = select_new_content(client, slides, content_index)
+    else:
+        new_slides = []
+        for slide in slides:
+            if slide['name'] not in client.requests_tracker:
+                new_slides.append(slide)
+            else:
+                print(f"Skipping already processed: {slide['name']}")
     
     if not new_slides:
         print("All slides have already been processed.")
-        download_results(client)
-        return
+        download_results(client, pool)
+    else:
+        print(f"Processing {len(new_slides)} new slides...")
+        
+        # Submit, wait, download and caption as overlapping stages, so each deck
+        # moves on as soon as its previous stage finishes
+        pipeline = SlidePipeline(client, pool, caption_agent)
+        pipeline.run_slides(new_slides)
+        print(f"\nProcessing complete!")
     
-    print(f"Processing {len(new_slides)} new slides...")
+    if content_index is not None:
+        link_alias_outputs(slides, content_index)
+
+
+def select_new_content(client: MinerUClient, slides: List[Dict], content_index: ContentIndex) -> List[Dict]:
+    """
+    Pick the slides whose PDF content has not been converted yet
     
-    # Create tasks for each new slide
-    for i, slide in enumerate(new_slides, 1):
-        print(f"\n[{i}/{len(new_slides)}] Creating task for: {slide['name']}")
-        try:
-            task_id = client.create_task(
-                url=slide['url'],
-                name=slide['name'],
-                is_ocr=True,
-                enable_formula=True,
-                enable_table=True,
-                language='en'
-            )
-            print(f"Created task with ID: {task_id}")
-        except Exception as e:
-            print(f"Error creating task for {slide['name']}: {str(e)}")
-    
-    # Wait for all tasks to complete
-    print(f"\nWaiting for all tasks to complete...")
-    for i, slide in enumerate(new_slides, 1):
-        print(f"\n[{i}/{len(new_slides)}] Waiting for: {slide['name']}")
-        try:
-            result = client.wait_for_task(slide['name'], timeout=600)
-            print(f"✓ Completed: {slide['name']}")
-        except Exception as e:
-            print(f"✗ Failed: {slide['name']} - {str(e)}")
+    Slides are matched by the SHA-256 of their PDF rather than by name: a PDF
+    already converted under another name becomes an alias of that task, and a
+    tracked name whose PDF changed is resubmitted to replace its task. Slides
+    that cannot be hashed fall back to the name check.
     
-    # Download all results
-    print(f"\nDownloading results...")
-    download_results(client)
+    Args:
+        client: MinerU client holding the tracked tasks
+        slides: Scraped slides with 'url' and 'name' keys
+        content_index: Index of converted PDF contents
+        
+    Returns:
+        Slides to submit for conversion, carrying their 'sha256'
+    """
+    print(f"Checking content of {len(slides)} slides...")
+    digests = content_index.digest_urls([slide['url'] for slide in slides])
+    chosen = set()
+    new_slides = []
+    
+    def holds(owner: Optional[str], digest: str) -> bool:
+        """Whether a task has (or is about to have) usable results for this content"""
+        if owner in chosen:
+            return True
+        info = client.requests_tracker.get(owner)
+        return (info is not None and info['state'] != TaskState.FAILED.value
+                and info.get('content_sha256') in (digest, None))
+    
+    for slide in slides:
+        name = slide['name']
+        digest = digests.get(slide['url'])
+        tracked = client.requests_tracker.get(name)
+        
+        if digest is None:
+            if tracked is None:
+                new_slides.append(slide)
+                chosen.add(name)
+            else:
+                print(f"Skipping already processed: {name}")
+            continue
+        
+        owner = content_index.task_for_digest(digest)
+        if owner != name and holds(owner, digest):
+            print(f"Skipping {name}: same PDF as {owner}, reusing its results")
+            content_index.record_alias(name, owner)
+            continue
+        
+        if tracked is not None:
+            if tracked.get('content_sha256') in (digest, None):
+                if tracked.get('content_sha256') is None:
+                    # Tasks created before the index existed adopt the current content
+                    tracked['content_sha256'] = digest
+                    client.save_task(name)
+                content_index.record_task(name, digest)
+                print(f"Skipping already processed: {name}")
+                continue
+            # The tracked task is only replaced once the new one has been created
+            print(f"PDF changed since {name} was converted, converting it again")
+            slide = {**slide, 'replace': True}
+        
+        content_index.record_task(name, digest)
+        new_slides.append({**slide, 'sha256': digest})
+        chosen.add(name)
     
-    print(f"\nProcessing complete!")
+    content_index.save()
+    return new_slides
+
+
+def link_alias_outputs(slides: List[Dict], content_index: ContentIndex) -> None:
+    """Point output/<alias> at the results of the task that converted the same PDF"""
+    for slide in slides:
+        owner = content_index.owner_of(slide['name'])
+        if owner is None:
+            continue
+        alias_dir = os.path.join('output', slide['name'])
+        owner_dir = os.path.join('output', owner)
+        if os.path.lexists(alias_dir) or not os.path.isdir(owner_dir):
+            continue
+        try:
+            os.symlink(os.path.relpath(owner_dir, os.path.dirname(alias_dir)), alias_dir, target_is_directory=True)
+        except OSError:
+            # Symlinks need extra privileges on Windows; fall back to a copy
+            shutil.copytree(owner_dir, alias_dir)
+        print(f"Linked results of {owner} to {alias_dir}")
+
+
+def create_caption_agent(workers: int, near_duplicates: bool = False) -> ImageCaptionAgent:
+    """Create the image captioning agent used by --caption"""
+    perceptual_index = None
+    if near_duplicates:
+        perceptual_index = PerceptualIndex()
+        perceptual_index.build('output')
+    return ImageCaptionAgent(GeminiClient(), max_workers=workers, cache=CaptionCache(),
+                             perceptual_index=perceptual_index, batch_size=5)
 
 
 def main():
@@ -551,23 +771,38 @@ def main():
     try:
         # Initialize the MinerU client
         client = MinerUClient(results_file=args.results_file)
+        pool = DownloadPool(
+            workers=args.download_workers,
+            per_host_limit=args.per_host_downloads,
+            artifacts=args.artifacts,
+            force=args.force_download,
+            revalidate=args.revalidate,
+            verify_hashes=args.verify_downloads
+        )
+        caption_agent = create_caption_agent(args.caption_workers, args.caption_near_duplicates) if args.caption else None
+        results_dir = os.path.dirname(args.results_file) or '.'
+        page_cache = None if args.no_page_cache else PageCache(os.path.join(results_dir, 'page_cache.json'))
+        content_index = None if args.no_content_index else ContentIndex(
+            os.path.join(results_dir, 'content_index.json')
+        )
         
         # Handle different modes of operation
         if args.cache_list:
             list_cached_files(client)
             
         elif args.cache_interactive:
-            interactive_cache_management(client)
+            interactive_cache_management(client, content_index)
             
         elif args.cache_clean:
-            clean_all_cache(client)
+            clean_all_cache(client, content_index)
             
         elif args.download_only or args.skip_processing:
-            download_results(client)
+            download_results(client, pool)
             
         elif args.interactive:
             url, keyword = get_course_input()
-            process_course_slides(client, url, keyword)
+            process_course_slides(client, url, pool, keyword, caption_agent, page_cache, args.link_parser,
+                                  content_index)
             
         elif args.pdf_interactive:
             pdf_url, pdf_name = get_pdf_input()
@@ -577,8 +812,12 @@ def main():
             file_path, local_name = get_local_file_input()
             process_local_file(client, file_path, local_name)
             
-        elif args.url:
-            process_course_slides(client, args.url, args.keyword)
+        elif args.url or args.urls_file:
+            urls = list(args.url or []) + (read_urls_file(args.urls_file) if args.urls_file else [])
+            process_courses(client, urls, pool, args.keyword, caption_agent,
+                            crawl_workers=args.crawl_workers, crawl_delay=args.crawl_delay,
+                            page_cache=page_cache, link_parser=args.link_parser,
+                            content_index=content_index)
             
         elif args.pdf_url:
             process_single_pdf(client, args.pdf_url, args.pdf_name)
@@ -586,6 +825,11 @@ def main():
         elif args.local_file:
             process_local_file(client, args.local_file, args.local_name)
             
+        elif args.local_dir:
+            process_local_directory(client, args.local_dir, pool, caption_agent)
+        
+        pool.close()
+            
     except KeyboardInterrupt:
         print("\n\nOperation cancelled by user.")
         # Save current state before exiting
@@ -2,9 +2,16 @@ from dotenv import load_dotenv
 import requests
 import os
 import time
-import json
-from typing import Dict, Optional, List
+import re
+import queue
+import threading
+from typing import Dict, Optional, List, Iterator, Tuple
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http_session import get_shared_session
+from rate_limit import TokenBucket
+from polling import AdaptivePollingStrategy
+from task_store import TaskStore, open_task_store
 
 class TaskState(Enum):
     PENDING = "pending"
@@ -14,8 +21,17 @@ class TaskState(Enum):
     FAILED = "failed"
     WAITING_FILE = "waiting-file"
 
+# Maximum number of files MinerU accepts in a single batch request
+MAX_BATCH_SIZE = 200
+
+# Base delay in seconds for exponential backoff between upload retries
+UPLOAD_BACKOFF_BASE = 1.0
+
 class MinerUClient:
-    def __init__(self, results_file: str = 'results/result.json'):
+    def __init__(self, results_file: str = 'results/result.json', upload_workers: int = 4,
+                 upload_retries: int = 3, session: Optional[requests.Session] = None,
+                 store: Optional[TaskStore] = None, status_requests_per_minute: float = 60,
+                 polling_strategy: Optional[AdaptivePollingStrategy] = None):
         load_dotenv()
         self.token = os.getenv('TOKEN')
         if not self.token:
@@ -23,72 +39,130 @@ class MinerUClient:
         
         self.base_url = 'https://mineru.net/api/v4/extract'
         self.upload_url = 'https://mineru.net/api/v4/file-urls/batch'
+        self.batch_results_url = 'https://mineru.net/api/v4/extract-results/batch'
         self.headers = {
             'Content-Type': 'application/json',
             'Authorization': f'Bearer {self.token}'
         }
         self.requests_tracker: Dict[str, Dict] = {}
+        # batch_id -> names of its tracked members, so batch polls don't rescan the tracker
+        self.batch_members: Dict[str, List[str]] = {}
         self.results_file = results_file
+        self.upload_workers = upload_workers
+        self.upload_retries = upload_retries
+        self.session = session or get_shared_session()
+        self.store = store or open_task_store(results_file)
+        # Status polls from every waiting task share one request budget
+        self.status_budget = TokenBucket(status_requests_per_minute)
+        self.polling_strategy = polling_strategy or AdaptivePollingStrategy()
+        # Serializes tracker and store updates when tasks are submitted and polled from different threads
+        self.state_lock = threading.RLock()
         
         # Try to load previous state if results file exists
         self.load_previous_state()
 
     def load_previous_state(self) -> None:
-        """Load previous task states from results file if it exists"""
-        if os.path.exists(self.results_file):
-            try:
-                with open(self.results_file, 'r') as f:
-                    previous_requests = json.load(f)
-                
-                # Convert the list of requests back to the tracker dictionary
-                for req in previous_requests:
-                    name = req['name']
-                    self.requests_tracker[name] = {
-                        'task_id': req.get('task_id'),
-                        'batch_id': req.get('batch_id'),
-                        'url': req['url'],
-                        'state': req['state'],
-                        'created_at': req['created_at'],
-                        'progress': req['progress'],
-                        'error_message': req['error_message'],
-                        'result': req['result'],
-                        'is_local_file': req.get('is_local_file', False)
-                    }
+        """Load every previous task state from the task store into the tracker (eagerly, at startup)"""
+        try:
+            previous_requests = self.store.load()
+            
+            # Convert the stored requests back to the tracker dictionary
+            for name, req in previous_requests.items():
+                self._set_entry(name, {
+                    'task_id': req.get('task_id'),
+                    'batch_id': req.get('batch_id'),
+                    'data_id': req.get('data_id'),
+                    'course': req.get('course'),
+                    'url': req['url'],
+                    'state': req['state'],
+                    'created_at': req['created_at'],
+                    'progress': req['progress'],
+                    'error_message': req['error_message'],
+                    'result': req['result'],
+                    'is_local_file': req.get('is_local_file', False),
+                    'content_sha256': req.get('content_sha256')
+                })
+            if previous_requests:
                 print(f"Loaded {len(previous_requests)} previous tasks from {self.results_file}")
-            except Exception as e:
-                print(f"Error loading previous state: {str(e)}")
+        except Exception as e:
+            print(f"Error loading previous state: {str(e)}")
 
     def save_current_state(self) -> None:
-        """Save current task states to results file"""
-        os.makedirs(os.path.dirname(self.results_file), exist_ok=True)
-        with open(self.results_file, 'w') as f:
-            json.dump(self.get_tracked_requests(), f, indent=4)
+        """Save all current task states to the task store"""
+        with self.state_lock:
+            self.store.save_all(self.get_tracked_requests())
         print(f"Saved current state to {self.results_file}")
 
+    def _set_entry(self, name: str, entry: Dict) -> None:
+        """Add or replace a tracker entry, keeping the batch index in step"""
+        with self.state_lock:
+            previous = self.requests_tracker.get(name)
+            if previous is not None:
+                self._unindex_batch_member(name, previous)
+            self.requests_tracker[name] = entry
+            if entry.get('batch_id'):
+                self.batch_members.setdefault(entry['batch_id'], []).append(name)
+
+    def _unindex_batch_member(self, name: str, entry: Dict) -> None:
+        members = self.batch_members.get(entry.get('batch_id'))
+        if members and name in members:
+            members.remove(name)
+            if not members:
+                del self.batch_members[entry['batch_id']]
+
+    def track_task(self, name: str, entry: Dict) -> None:
+        """Add or replace a tracked task and persist it"""
+        with self.state_lock:
+            self._set_entry(name, entry)
+            self.save_task(name)
+
+    def save_task(self, name: str) -> None:
+        """Persist the current state of a single task"""
+        with self.state_lock:
+            self.store.put(name, self.requests_tracker[name])
+            if self.store.needs_compaction():
+                self.save_current_state()
+
+    def delete_task(self, name: str) -> None:
+        """Remove a task from the tracker and the task store"""
+        with self.state_lock:
+            if name in self.requests_tracker:
+                self._unindex_batch_member(name, self.requests_tracker.pop(name))
+                self.store.delete(name)
+                if self.store.needs_compaction():
+                    self.save_current_state()
+
+    def query_tasks(self, states: Optional[List[str]] = None, course: Optional[str] = None,
+                    created_after: Optional[float] = None) -> List[Dict]:
+        """
+        Get tracked requests matching the given filters, ordered by creation time
+        
+        Args:
+            states: Only include tasks in one of these states
+            course: Only include tasks scraped from this course URL
+            created_after: Only include tasks created after this timestamp
+            
+        Returns:
+            List of dictionaries containing request information
+        """
+        names = self.store.query(states=states, course=course, created_after=created_after)
+        return [self._describe_request(name) for name in names if name in self.requests_tracker]
+
     def get_completed_tasks(self) -> List[Dict]:
         """Get all tasks that have been completed successfully"""
-        return [
-            req for req in self.get_tracked_requests()
-            if req['state'] == TaskState.COMPLETED.value
-        ]
+        return self.query_tasks(states=[TaskState.COMPLETED.value])
 
     def get_failed_tasks(self) -> List[Dict]:
         """Get all tasks that have failed"""
-        return [
-            req for req in self.get_tracked_requests()
-            if req['state'] == TaskState.FAILED.value
-        ]
+        return self.query_tasks(states=[TaskState.FAILED.value])
 
     def get_pending_tasks(self) -> List[Dict]:
         """Get all tasks that are still pending or running"""
-        return [
-            req for req in self.get_tracked_requests()
-            if req['state'] in [TaskState.PENDING.value, TaskState.RUNNING.value, TaskState.CONVERTING.value, TaskState.WAITING_FILE.value]
-        ]
+        return self.query_tasks(states=[TaskState.PENDING.value, TaskState.RUNNING.value, TaskState.CONVERTING.value, TaskState.WAITING_FILE.value])
 
     def create_task(self, url: str, name: str, is_ocr: bool = True, 
                    enable_formula: bool = True, enable_table: bool = True, 
-                   language: str = 'en') -> str:
+                   language: str = 'en', course: Optional[str] = None) -> str:
         """
         Create a new extraction task
         
@@ -99,6 +173,7 @@ class MinerUClient:
             enable_formula: Whether to extract formulas
             enable_table: Whether to extract tables
             language: Language of the document
+            course: Course schedule URL the PDF was scraped from, if any
             
         Returns:
             task_id: The ID of the created task
@@ -118,7 +193,7 @@ class MinerUClient:
         }
         
         print(data)
-        response = requests.post(endpoint, headers=self.headers, json=data)
+        response = self.session.post(endpoint, headers=self.headers, json=data)
         print(response.status_code)
         print(response.json())
         print(response.json()["data"])
@@ -126,9 +201,16 @@ class MinerUClient:
         task_id = response.json()["data"]["task_id"]
         
         # Track the request
-        self.requests_tracker[name] = {
+        self.track_url_task(name, task_id, url, course)
+        
+        return task_id
+
+    def track_url_task(self, name: str, task_id: str, url: str, course: Optional[str]) -> None:
+        """Track and persist a newly created single-URL task"""
+        self.track_task(name, {
             'task_id': task_id,
             'batch_id': None,
+            'course': course,
             'url': url,
             'state': TaskState.PENDING.value,
             'created_at': time.time(),
@@ -136,12 +218,7 @@ class MinerUClient:
             'progress': None,
             'error_message': None,
             'is_local_file': False
-        }
-        
-        # Save state after creating new task
-        self.save_current_state()
-        
-        return task_id
+        })
 
     def create_local_file_task(self, file_path: str, name: str = None, is_ocr: bool = True,
                               enable_formula: bool = True, enable_table: bool = True,
@@ -172,8 +249,137 @@ class MinerUClient:
             print(f"Task {name} already exists with state: {self.get_state_description(self.requests_tracker[name]['state'])}")
             return self.requests_tracker[name].get('batch_id', '')
 
-        # Step 1: Request upload URL
-        data = {
+        batch_ids = self.create_local_file_tasks(
+            [(file_path, name)],
+            is_ocr=is_ocr,
+            enable_formula=enable_formula,
+            enable_table=enable_table,
+            language=language
+        )
+        return batch_ids[0]
+
+    def create_tasks(self, slides: List[Dict], is_ocr: bool = True,
+                     enable_formula: bool = True, enable_table: bool = True,
+                     language: str = 'en') -> List[str]:
+        """
+        Create extraction tasks for several URLs using the batch endpoint
+        
+        Every batch request carries up to MAX_BATCH_SIZE files, and all of its
+        members are tracked under the shared batch_id.
+        
+        Args:
+            slides: List of dicts with 'url' and 'name' keys, and optionally 'course', 'sha256'
+                (content digest recorded on the task) and 'replace' (resubmit a tracked name)
+            is_ocr: Whether to perform OCR
+            enable_formula: Whether to extract formulas
+            enable_table: Whether to extract tables
+            language: Language of the document
+            
+        Returns:
+            List of batch_ids that were created
+        """
+        batch_ids = []
+        for chunk in self.batch_chunks(self.untracked_slides(slides)):
+            data_ids = [self.make_data_id(slide['name'], i) for i, slide in enumerate(chunk)]
+            data = self.url_batch_data(chunk, data_ids, is_ocr, enable_formula, enable_table, language)
+            
+            print(f"Creating batch task for {len(chunk)} URLs")
+            batch_id = self._post_batch(f"{self.base_url}/task/batch", data)["batch_id"]
+            print(f"Created batch with ID: {batch_id}")
+            
+            self.track_url_batch(batch_id, chunk, data_ids)
+            batch_ids.append(batch_id)
+        
+        return batch_ids
+
+    def create_local_file_tasks(self, files: List[Tuple[str, Optional[str]]], is_ocr: bool = True,
+                                enable_formula: bool = True, enable_table: bool = True,
+                                language: str = 'en') -> List[str]:
+        """
+        Create extraction tasks for several local files using the batch endpoint
+        
+        Args:
+            files: List of (file_path, name) tuples; name is auto-generated if None
+            is_ocr: Whether to perform OCR
+            enable_formula: Whether to extract formulas
+            enable_table: Whether to extract tables
+            language: Language of the document
+            
+        Returns:
+            List of batch_ids that were created
+        """
+        batch_ids = []
+        for chunk in self.batch_chunks(self.untracked_local_files(files)):
+            data_ids = [self.make_data_id(name, i) for i, (_, name) in enumerate(chunk)]
+            
+            # Step 1: Request upload URLs for the whole batch
+            data = self.upload_batch_data(chunk, data_ids, is_ocr, enable_formula, enable_table, language)
+            
+            print(f"Requesting upload URLs for {len(chunk)} files")
+            result = self._post_batch(self.upload_url, data)
+            batch_id = result["batch_id"]
+            file_urls = result["file_urls"]
+            
+            if len(file_urls) != len(chunk):
+                raise Exception(f"Expected {len(chunk)} upload URLs, received {len(file_urls)}")
+            
+            # Step 2: Upload the files in parallel
+            self.upload_files([(file_path, upload_url) for (file_path, _), upload_url in zip(chunk, file_urls)])
+            
+            print(f"Files uploaded successfully. Batch ID: {batch_id}")
+            
+            # Track the requests
+            self.track_upload_batch(batch_id, chunk, data_ids)
+            batch_ids.append(batch_id)
+        
+        return batch_ids
+
+    def untracked_slides(self, slides: List[Dict]) -> List[Dict]:
+        """Drop slides that are already tracked, unless they are marked to replace the tracked task"""
+        new_slides = []
+        for slide in slides:
+            if slide['name'] in self.requests_tracker and not slide.get('replace'):
+                print(f"Task {slide['name']} already exists with state: {self.get_state_description(self.requests_tracker[slide['name']]['state'])}")
+            else:
+                new_slides.append(slide)
+        return new_slides
+
+    def untracked_local_files(self, files: List[Tuple[str, Optional[str]]]) -> List[Tuple[str, str]]:
+        """Check that local files exist, fill in default names and drop files that are already tracked"""
+        new_files = []
+        for file_path, name in files:
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"File not found: {file_path}")
+            name = name or os.path.basename(file_path)
+            if name in self.requests_tracker:
+                print(f"Task {name} already exists with state: {self.get_state_description(self.requests_tracker[name]['state'])}")
+            else:
+                new_files.append((file_path, name))
+        return new_files
+
+    @staticmethod
+    def url_batch_data(chunk: List[Dict], data_ids: List[str], is_ocr: bool, enable_formula: bool,
+                        enable_table: bool, language: str) -> Dict:
+        """Build the request body for a URL batch"""
+        return {
+            "enable_formula": enable_formula,
+            "enable_table": enable_table,
+            "language": language,
+            "files": [
+                {
+                    "url": slide['url'],
+                    "is_ocr": is_ocr,
+                    "data_id": data_id
+                }
+                for slide, data_id in zip(chunk, data_ids)
+            ]
+        }
+
+    @staticmethod
+    def upload_batch_data(chunk: List[Tuple[str, str]], data_ids: List[str], is_ocr: bool,
+                           enable_formula: bool, enable_table: bool, language: str) -> Dict:
+        """Build the request body asking for upload URLs for a batch of local files"""
+        return {
             "enable_formula": enable_formula,
             "enable_table": enable_table,
             "language": language,
@@ -181,56 +387,181 @@ class MinerUClient:
                 {
                     "name": os.path.basename(file_path),
                     "is_ocr": is_ocr,
-                    "data_id": name
+                    "data_id": data_id
                 }
+                for (file_path, _), data_id in zip(chunk, data_ids)
             ]
         }
+
+    def track_url_batch(self, batch_id: str, chunk: List[Dict], data_ids: List[str]) -> None:
+        """Track and persist the members of a newly created URL batch"""
+        for slide, data_id in zip(chunk, data_ids):
+            self.track_task(slide['name'], self.new_batch_entry(
+                batch_id, data_id, slide['url'], TaskState.PENDING.value, is_local_file=False,
+                course=slide.get('course'), content_sha256=slide.get('sha256')
+            ))
+
+    def track_upload_batch(self, batch_id: str, chunk: List[Tuple[str, str]], data_ids: List[str]) -> None:
+        """Track and persist the members of a batch of uploaded local files"""
+        for (file_path, name), data_id in zip(chunk, data_ids):
+            self.track_task(name, self.new_batch_entry(
+                batch_id, data_id, file_path, TaskState.WAITING_FILE.value, is_local_file=True
+            ))
+
+    def upload_files(self, uploads: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Upload local files to their presigned URLs using a bounded thread pool
         
-        print(f"Requesting upload URL for: {file_path}")
-        response = requests.post(self.upload_url, headers=self.headers, json=data)
+        Args:
+            uploads: List of (file_path, upload_url) tuples
+            
+        Returns:
+            List of per-file upload stats (file_path, bytes, seconds, bytes_per_sec)
+        """
+        stats = []
+        with ThreadPoolExecutor(max_workers=self.upload_workers) as executor:
+            futures = {
+                executor.submit(self._upload_file, file_path, upload_url): file_path
+                for file_path, upload_url in uploads
+            }
+            errors = []
+            for future in as_completed(futures):
+                try:
+                    stats.append(future.result())
+                except Exception as e:
+                    errors.append(f"{futures[future]}: {str(e)}")
         
-        if response.status_code != 200:
-            raise Exception(f"Failed to get upload URL: {response.status_code} - {response.text}")
+        if errors:
+            raise Exception(f"Failed to upload {len(errors)} file(s): {'; '.join(errors)}")
         
-        result = response.json()
-        if result["code"] != 0:
-            raise Exception(f"API error: {result.get('msg', 'Unknown error')}")
+        total_bytes = sum(stat['bytes'] for stat in stats)
+        print(f"Uploaded {len(stats)} files ({total_bytes / 1024 / 1024:.1f} MB)")
+        return stats
+
+    def _upload_file(self, file_path: str, upload_url: str) -> Dict:
+        """
+        Stream a single file to its presigned URL, retrying transient failures
         
-        batch_id = result["data"]["batch_id"]
-        file_urls = result["data"]["file_urls"]
+        Args:
+            file_path: Path to the local file
+            upload_url: Presigned URL to PUT the file to
+            
+        Returns:
+            Dict with upload stats for the file
+        """
+        size = os.path.getsize(file_path)
         
-        if not file_urls:
-            raise Exception("No upload URLs received")
+        for attempt in range(1, self.upload_retries + 1):
+            start_time = time.time()
+            try:
+                # Passing the file object lets requests stream it from disk
+                with open(file_path, 'rb') as f:
+                    upload_response = self.session.put(upload_url, data=f)
+                
+                if upload_response.status_code == 200:
+                    return self.upload_stats(file_path, size, start_time)
+                error = self.upload_status_error(upload_response.status_code)
+                
+            except requests.exceptions.RequestException as e:
+                error = str(e)
+            
+            delay = self.upload_retry_delay(file_path, attempt, error)
+            if delay is not None:
+                time.sleep(delay)
         
-        upload_url = file_urls[0]
+        raise Exception(f"Failed to upload file after {self.upload_retries} attempts: {error}")
+
+    @staticmethod
+    def upload_stats(file_path: str, size: int, start_time: float) -> Dict:
+        """Report a finished upload and return its stats (file_path, bytes, seconds, bytes_per_sec)"""
+        elapsed = max(time.time() - start_time, 1e-6)
+        print(f"Uploaded {os.path.basename(file_path)}: {size / 1024:.0f} KB in {elapsed:.1f}s "
+              f"({size / elapsed / 1024:.0f} KB/s)")
+        return {
+            'file_path': file_path,
+            'bytes': size,
+            'seconds': elapsed,
+            'bytes_per_sec': size / elapsed
+        }
+
+    @staticmethod
+    def upload_status_error(status: int) -> str:
+        """
+        Describe a failed upload response, raising if retrying cannot help
         
-        # Step 2: Upload the file
-        print(f"Uploading file to: {upload_url}")
-        with open(file_path, 'rb') as f:
-            upload_response = requests.put(upload_url, data=f)
+        Returns:
+            Error description for a retryable status (5xx or 429)
+        """
+        # Client errors other than throttling will not succeed on retry
+        if status < 500 and status != 429:
+            raise Exception(f"Failed to upload file: {status}")
+        return f"HTTP {status}"
+
+    def upload_retry_delay(self, file_path: str, attempt: int, error: str) -> Optional[float]:
+        """
+        Backoff before retrying a failed upload attempt
         
-        if upload_response.status_code != 200:
-            raise Exception(f"Failed to upload file: {upload_response.status_code}")
+        Args:
+            file_path: Path of the file being uploaded
+            attempt: Number of the attempt that failed, starting at 1
+            error: Why the attempt failed
+            
+        Returns:
+            Seconds to wait before the next attempt, or None if no attempts are left
+        """
+        if attempt >= self.upload_retries:
+            return None
+        delay = UPLOAD_BACKOFF_BASE * 2 ** (attempt - 1)
+        print(f"Upload of {os.path.basename(file_path)} failed ({error}), retrying in {delay:.0f}s...")
+        return delay
+
+    def _post_batch(self, endpoint: str, data: Dict) -> Dict:
+        """POST a batch request and return its data payload"""
+        response = self.session.post(endpoint, headers=self.headers, json=data)
         
-        print(f"File uploaded successfully. Batch ID: {batch_id}")
+        if response.status_code != 200:
+            raise Exception(f"Batch request failed: {response.status_code} - {response.text}")
         
-        # Track the request
-        self.requests_tracker[name] = {
+        return self.batch_response_data(response.json())
+
+    @staticmethod
+    def batch_response_data(result: Dict) -> Dict:
+        """Return the data payload of a batch response, raising on API errors"""
+        if result["code"] != 0:
+            raise Exception(f"API error: {result.get('msg', 'Unknown error')}")
+        
+        return result["data"]
+
+    @staticmethod
+    def batch_chunks(items: List) -> Iterator[List]:
+        """Split items into chunks no larger than MAX_BATCH_SIZE"""
+        for i in range(0, len(items), MAX_BATCH_SIZE):
+            yield items[i:i + MAX_BATCH_SIZE]
+
+    @staticmethod
+    def make_data_id(name: str, index: int) -> str:
+        """Build a batch data_id from a tracking name (letters, digits, '_', '-', '.' only)"""
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+        return f"{index}-{safe_name}"[:128]
+
+    @staticmethod
+    def new_batch_entry(batch_id: str, data_id: str, url: str, state: str, is_local_file: bool,
+                         course: Optional[str] = None, content_sha256: Optional[str] = None) -> Dict:
+        """Build a tracker entry for a member of a batch"""
+        return {
             'task_id': None,
             'batch_id': batch_id,
-            'url': file_path,  # Store local file path
-            'state': TaskState.WAITING_FILE.value,
+            'data_id': data_id,
+            'course': course,
+            'url': url,
+            'state': state,
             'created_at': time.time(),
             'result': None,
             'progress': None,
             'error_message': None,
-            'is_local_file': True
+            'is_local_file': is_local_file,
+            'content_sha256': content_sha256
         }
-        
-        # Save state after creating new task
-        self.save_current_state()
-        
-        return batch_id
 
     def get_task_status(self, task_id: str) -> Dict:
         """
@@ -243,7 +574,8 @@ class MinerUClient:
             Dict containing task status and data
         """
         endpoint = f"{self.base_url}/task/{task_id}"
-        response = requests.get(endpoint, headers=self.headers)
+        self.status_budget.acquire()
+        response = self.session.get(endpoint, headers=self.headers)
         response.raise_for_status()
         return response.json()["data"]
 
@@ -257,12 +589,42 @@ class MinerUClient:
         Returns:
             List of dictionaries containing task status and data
         """
-        endpoint = f"https://mineru.net/api/v4/extract-results/batch/{batch_id}"
-        response = requests.get(endpoint, headers=self.headers)
+        endpoint = f"{self.batch_results_url}/{batch_id}"
+        self.status_budget.acquire()
+        response = self.session.get(endpoint, headers=self.headers)
         response.raise_for_status()
         result = response.json()
         return result["data"]["extract_result"]
 
+    def get_batch_member_statuses(self, batch_id: str) -> Dict[str, Dict]:
+        """
+        Get the status of every tracked member of a batch with a single request
+        
+        Args:
+            batch_id: The ID of the batch to check
+            
+        Returns:
+            Dict mapping tracked request names to their status data
+        """
+        return self.match_batch_members(batch_id, self.get_batch_status(batch_id))
+
+    def match_batch_members(self, batch_id: str, batch_results: List[Dict]) -> Dict[str, Dict]:
+        """Map a batch's extract results to the tracked requests they belong to"""
+        by_data_id = {item.get('data_id'): item for item in batch_results}
+        
+        with self.state_lock:
+            members = [(name, self.requests_tracker[name]) for name in self.batch_members.get(batch_id, [])]
+        
+        statuses = {}
+        for name, info in members:
+            status_data = by_data_id.get(info.get('data_id')) or by_data_id.get(name)
+            if status_data is None and len(batch_results) == 1:
+                # Single-file batches created before data_ids were tracked
+                status_data = batch_results[0]
+            if status_data is not None:
+                statuses[name] = status_data
+        return statuses
+
     def get_state_description(self, state: str) -> str:
         """Get a human-readable description of the task state"""
         state_descriptions = {
@@ -275,89 +637,283 @@ class MinerUClient:
         }
         return state_descriptions.get(state, f"Unknown state: {state}")
 
-    def wait_for_task(self, name: str, timeout: int = 300, check_interval: int = 5) -> Dict:
+    def wait_for_task(self, name: str, timeout: int = 300, check_interval: Optional[float] = None) -> Dict:
         """
         Wait for a task to complete
         
         Args:
             name: Name of the tracked request
             timeout: Maximum time to wait in seconds
-            check_interval: Time between status checks in seconds
+            check_interval: Fixed time between status checks in seconds
+                (None picks intervals adaptively from the task state and progress)
             
         Returns:
             Dict containing the final task result
         """
-        if name not in self.requests_tracker:
-            raise ValueError(f"No tracked request found with name: {name}")
+        for _, result, error in self.wait_for_tasks([name], timeout=timeout, check_interval=check_interval):
+            if error is not None:
+                raise error
+            return result
+
+    def wait_for_tasks(self, names: List[str], timeout: int = 300,
+                       check_interval: Optional[float] = None) -> Iterator[Tuple[str, Optional[Dict], Optional[Exception]]]:
+        """
+        Wait for several tasks at once, yielding each one as soon as it finishes
+        
+        All in-flight tasks are polled from one scheduler, so the total wait is
+        bounded by the slowest task rather than the sum of all waits. Each task
+        is polled on its own adaptive interval, and status requests draw from
+        the client's shared request budget.
+        
+        Args:
+            names: Names of the tracked requests to wait for
+            timeout: Maximum time to wait in seconds (shared by all tasks)
+            check_interval: Fixed time between status checks in seconds
+                (None picks intervals adaptively from the task state and progress)
             
-        request_info = self.requests_tracker[name]
+        Yields:
+            Tuples of (name, result, error); exactly one of result/error is set
+        """
+        submitted: 'queue.Queue[Optional[List[str]]]' = queue.Queue()
+        submitted.put(names)
+        submitted.put(None)
+        yield from self.wait_for_submitted_tasks(submitted, timeout=timeout, check_interval=check_interval)
+
+    def wait_for_submitted_tasks(self, submitted: 'queue.Queue[Optional[List[str]]]', timeout: int = 300,
+                                 check_interval: Optional[float] = None
+                                 ) -> Iterator[Tuple[str, Optional[Dict], Optional[Exception]]]:
+        """
+        Wait for tasks that are still being submitted, yielding each one as soon as it finishes
+        
+        Lists of task names arrive on the queue while earlier tasks are already
+        being polled; None marks the end of submission. Polling works as in
+        wait_for_tasks, and each task's timeout counts from when it arrived.
         
-        # If task is already completed, return the result
-        if request_info['state'] == TaskState.COMPLETED.value:
-            print(f"Task {name} was already completed")
-            return request_info['result']
+        Args:
+            submitted: Queue of lists of task names, terminated by None
+            timeout: Maximum time to wait for each task in seconds
+            check_interval: Fixed time between status checks in seconds
+                (None picks intervals adaptively from the task state and progress)
             
-        # If task failed, raise the error
-        if request_info['state'] == TaskState.FAILED.value:
-            error_msg = request_info['error_message']
-            raise Exception(f"Task failed: {error_msg}")
+        Yields:
+            Tuples of (name, result, error); exactly one of result/error is set
+        """
+        in_flight: Dict[str, Optional[str]] = {}
+        next_poll: Dict[str, float] = {}
+        deadlines: Dict[str, float] = {}
+        arrived: List[Optional[List[str]]] = []
+        submitting = True
         
-        start_time = time.time()
-        last_state = None
+        while True:
+            # Start tracking newly submitted tasks
+            for group in arrived:
+                if group is None:
+                    submitting = False
+                    continue
+                finished, new_tasks = self.partition_tasks([name for name in group if name not in in_flight])
+                yield from finished
+                now = time.monotonic()
+                for name in new_tasks:
+                    in_flight[name] = None
+                    next_poll[name] = now
+                    deadlines[name] = now + timeout
+                if len(new_tasks) == 1:
+                    print(f"Waiting for task {next(iter(new_tasks))} to complete...")
+                elif new_tasks:
+                    print(f"Waiting for {len(new_tasks)} tasks to complete...")
+            arrived = []
+            
+            if not in_flight:
+                if not submitting:
+                    break
+                # Nothing to poll until more tasks are submitted
+                arrived.append(submitted.get())
+                continue
+            
+            due = self.due_tasks(in_flight, next_poll)
+            
+            batch_cache: Dict[str, Dict[str, Dict]] = {}
+            for name in due:
+                try:
+                    current_state, status_data = self._poll_task(name, in_flight[name], batch_cache)
+                except requests.exceptions.RequestException as e:
+                    print(f"Network error checking status of {name}: {e}")
+                    next_poll[name] = time.monotonic() + self.next_poll_interval(name, in_flight[name], None, check_interval)
+                    continue
+                except ValueError as e:
+                    del in_flight[name]
+                    yield name, None, e
+                    continue
+                
+                outcome = self.settle_poll(name, current_state, status_data, in_flight, next_poll, check_interval)
+                if outcome is not None:
+                    yield outcome
+            
+            now = time.monotonic()
+            for name in [name for name in in_flight if deadlines[name] <= now]:
+                del in_flight[name]
+                self.polling_strategy.forget(name)
+                yield name, None, TimeoutError(f"Task did not complete within {timeout} seconds")
+            
+            if not in_flight:
+                continue
+            
+            wake_time = min(min(next_poll[name] for name in in_flight), min(deadlines[name] for name in in_flight))
+            delay = max(wake_time - time.monotonic(), 0)
+            if submitting:
+                # Sleep until the next poll is due, waking early for new submissions
+                try:
+                    arrived.append(submitted.get(timeout=delay) if delay > 0 else submitted.get_nowait())
+                except queue.Empty:
+                    pass
+            else:
+                time.sleep(delay)
 
-        print(f"Waiting for task {name} to complete...")
+    def partition_tasks(self, names: List[str]) -> Tuple[List[Tuple[str, Optional[Dict], Optional[Exception]]],
+                                                          Dict[str, Optional[str]]]:
+        """
+        Split tasks to wait for into already finished ones and ones still in flight
         
-        while time.time() - start_time < timeout:
-            try:
-                if request_info['is_local_file'] and request_info['batch_id']:
-                    # Handle batch upload status
-                    batch_results = self.get_batch_status(request_info['batch_id'])
-                    if batch_results:
-                        status_data = batch_results[0]  # Assuming single file
-                        current_state = status_data['state']
-                    else:
-                        current_state = TaskState.WAITING_FILE.value
-                        status_data = {}
-                else:
-                    # Handle regular URL-based task
-                    task_id = request_info['task_id']
-                    if not task_id:
-                        raise ValueError(f"No task_id found for {name}")
-                    status_data = self.get_task_status(task_id)
-                    current_state = status_data['state']
-                
-                # Only print state changes
-                if current_state != last_state:
-                    print(f"Task state: {self.get_state_description(current_state)}")
-                    last_state = current_state
-                
-                self.requests_tracker[name]['state'] = current_state
-                
-                # Update progress if available
-                if 'extract_progress' in status_data:
-                    self.requests_tracker[name]['progress'] = status_data['extract_progress']
-                    progress = status_data['extract_progress']
-                    print(f"Progress: {progress['extracted_pages']}/{progress['total_pages']} pages")
-                
-                if current_state == TaskState.COMPLETED.value:
-                    self.requests_tracker[name]['result'] = status_data
-                    # Save state after task completion
-                    self.save_current_state()
-                    return status_data
-                elif current_state == TaskState.FAILED.value:
-                    error_msg = status_data.get('err_msg', 'Unknown error')
-                    self.requests_tracker[name]['error_message'] = error_msg
-                    self.requests_tracker[name]['result'] = status_data
-                    # Save state after task failure
-                    self.save_current_state()
-                    raise Exception(f"Task failed: {error_msg}")
-                    
-            except requests.exceptions.RequestException as e:
-                print(f"Network error checking task status: {e}")
-                
-            time.sleep(check_interval)
+        Returns:
+            Tuple of ((name, result, error) for finished tasks, in-flight names mapped to None)
+        """
+        finished = []
+        in_flight: Dict[str, Optional[str]] = {}
+        for name in dict.fromkeys(names):
+            if name not in self.requests_tracker:
+                finished.append((name, None, ValueError(f"No tracked request found with name: {name}")))
+                continue
+            
+            request_info = self.requests_tracker[name]
+            if request_info['state'] == TaskState.COMPLETED.value:
+                print(f"Task {name} was already completed")
+                finished.append((name, request_info['result'], None))
+            elif request_info['state'] == TaskState.FAILED.value:
+                finished.append((name, None, Exception(f"Task failed: {request_info['error_message']}")))
+            else:
+                in_flight[name] = None
+        return finished, in_flight
+
+    def due_tasks(self, in_flight: Dict[str, Optional[str]], next_poll: Dict[str, float]) -> List[str]:
+        """Names of in-flight tasks to poll now, including members of batches that are due anyway"""
+        now = time.monotonic()
+        due = [name for name in in_flight if next_poll[name] <= now]
+        
+        # Members of a batch that is fetched anyway are refreshed for free
+        due_batches = {self.requests_tracker[name].get('batch_id') for name in due} - {None}
+        due += [
+            name for name in in_flight
+            if name not in due and self.requests_tracker[name].get('batch_id') in due_batches
+        ]
+        return due
+
+    def settle_poll(self, name: str, current_state: str, status_data: Dict, in_flight: Dict[str, Optional[str]],
+                     next_poll: Dict[str, float], check_interval: Optional[float]
+                     ) -> Optional[Tuple[str, Optional[Dict], Optional[Exception]]]:
+        """
+        Handle a polled status: finish the task or schedule its next poll
+        
+        Returns:
+            (name, result, error) if the task finished, otherwise None
+        """
+        in_flight[name] = current_state
+        if current_state == TaskState.COMPLETED.value:
+            del in_flight[name]
+            self.polling_strategy.forget(name)
+            return name, status_data, None
+        if current_state == TaskState.FAILED.value:
+            del in_flight[name]
+            self.polling_strategy.forget(name)
+            return name, None, Exception(f"Task failed: {self.requests_tracker[name]['error_message']}")
+        
+        progress = status_data.get('extract_progress')
+        next_poll[name] = time.monotonic() + self.next_poll_interval(name, current_state, progress, check_interval)
+        return None
+
+    def next_poll_interval(self, name: str, state: Optional[str], progress: Optional[Dict],
+                            check_interval: Optional[float]) -> float:
+        """Get the delay before the next status check, fixed or adaptive"""
+        if check_interval is not None:
+            return check_interval
+        self.polling_strategy.observe(name, progress)
+        return self.polling_strategy.next_interval(name, state or TaskState.PENDING.value, progress)
+
+    def _poll_task(self, name: str, last_state: Optional[str] = None,
+                   batch_cache: Optional[Dict[str, Dict[str, Dict]]] = None) -> Tuple[str, Dict]:
+        """
+        Fetch the current status of a tracked task and update the tracker
+        
+        Args:
+            name: Name of the tracked request
+            last_state: Previously observed state, used to only print state changes
+            batch_cache: Batch statuses already fetched during this polling cycle
             
-        raise TimeoutError(f"Task did not complete within {timeout} seconds")
+        Returns:
+            Tuple of (current_state, status_data)
+        """
+        request_info = self.requests_tracker[name]
+        
+        if request_info.get('batch_id'):
+            # Handle batch member status, sharing one request per batch per cycle
+            batch_id = request_info['batch_id']
+            if batch_cache is None or batch_id not in batch_cache:
+                statuses = self.get_batch_member_statuses(batch_id)
+                if batch_cache is not None:
+                    batch_cache[batch_id] = statuses
+            else:
+                statuses = batch_cache[batch_id]
+            status_data = statuses.get(name, {})
+        else:
+            # Handle regular URL-based task
+            task_id = request_info['task_id']
+            if not task_id:
+                raise ValueError(f"No task_id found for {name}")
+            status_data = self.get_task_status(task_id)
+        
+        return self.record_status(name, status_data, last_state), status_data
+
+    def record_status(self, name: str, status_data: Dict, last_state: Optional[str] = None) -> str:
+        """
+        Apply a fetched status to the tracker, printing and persisting changes
+        
+        Args:
+            name: Name of the tracked request
+            status_data: Task or batch member status returned by the API
+            last_state: Previously observed state, used to only print state changes
+            
+        Returns:
+            The task's current state
+        """
+        request_info = self.requests_tracker[name]
+        # Batch members have no state until the file is queued for parsing
+        current_state = status_data.get('state', TaskState.WAITING_FILE.value)
+        
+        # Only print state changes
+        if current_state != last_state:
+            print(f"Task {name} state: {self.get_state_description(current_state)}")
+        
+        request_info['state'] = current_state
+        
+        # Update progress if available
+        if 'extract_progress' in status_data:
+            request_info['progress'] = status_data['extract_progress']
+            progress = status_data['extract_progress']
+            print(f"Task {name} progress: {progress['extracted_pages']}/{progress['total_pages']} pages")
+        
+        if current_state == TaskState.COMPLETED.value:
+            request_info['result'] = status_data
+            # Save state after task completion
+            self.save_task(name)
+        elif current_state == TaskState.FAILED.value:
+            request_info['error_message'] = status_data.get('err_msg', 'Unknown error')
+            request_info['result'] = status_data
+            # Save state after task failure
+            self.save_task(name)
+        elif current_state != last_state:
+            # Keep the store's state index in step with the tracker
+            self.save_task(name)
+        
+        return current_state
 
     def get_tracked_requests(self) -> List[Dict]:
         """
@@ -366,22 +922,30 @@ class MinerUClient:
         Returns:
             List of dictionaries containing request information
         """
-        return [
-            {
-                'name': name,
-                'task_id': info.get('task_id'),
-                'batch_id': info.get('batch_id'),
-                'url': info['url'],
-                'state': info['state'],
-                'state_description': self.get_state_description(info['state']),
-                'created_at': info['created_at'],
-                'progress': info['progress'],
-                'error_message': info['error_message'],
-                'result': info['result'],
-                'is_local_file': info.get('is_local_file', False)
-            }
-            for name, info in self.requests_tracker.items()
-        ]
+        # Snapshot the entries first; another thread may be adding tasks
+        with self.state_lock:
+            entries = list(self.requests_tracker.items())
+        return [self._describe_request(name, info) for name, info in entries]
+
+    def _describe_request(self, name: str, info: Optional[Dict] = None) -> Dict:
+        """Build the public description of a tracked request"""
+        info = info or self.requests_tracker[name]
+        return {
+            'name': name,
+            'task_id': info.get('task_id'),
+            'batch_id': info.get('batch_id'),
+            'data_id': info.get('data_id'),
+            'course': info.get('course'),
+            'url': info['url'],
+            'state': info['state'],
+            'state_description': self.get_state_description(info['state']),
+            'created_at': info['created_at'],
+            'progress': info['progress'],
+            'error_message': info['error_message'],
+            'result': info['result'],
+            'is_local_file': info.get('is_local_file', False),
+            'content_sha256': info.get('content_sha256')
+        }
 
     def get_request_by_name(self, name: str) -> Optional[Dict]:
         """
@@ -0,0 +1,80 @@
+import time
+import hashlib
+import threading
+from typing import Dict, List, Optional
+from json_store import load_json, write_json_atomic
+
+DEFAULT_PAGE_CACHE_FILE = 'results/page_cache.json'
+
+
+def links_fingerprint(links: List[Dict]) -> str:
+    """SHA-256 of a link set, independent of link order"""
+    lines = sorted(f"{link['url']}\t{link['name']}" for link in links)
+    return hashlib.sha256('\n'.join(lines).encode('utf-8')).hexdigest()
+
+
+class PageCache:
+    """
+    On-disk cache of scraped schedule pages
+
+    For every page URL it keeps the ETag and Last-Modified validators, the
+    extracted links and a fingerprint of the link set. The validators let the
+    scraper send conditional requests; on 304 Not Modified the cached links
+    are reused without parsing, and the fingerprint tells whether a freshly
+    parsed page actually gained or lost links.
+    """
+
+    def __init__(self, cache_file: str = DEFAULT_PAGE_CACHE_FILE):
+        self.cache_file = cache_file
+        self.pages: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Load cached pages from disk"""
+        self.pages = load_json(self.cache_file, {}, label='page cache')
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Cached entry for a page URL, or None"""
+        with self.lock:
+            return self.pages.get(url)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a cached page"""
+        entry = self.get(url)
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url: str, headers, links: List[Dict]) -> bool:
+        """
+        Store a freshly parsed page and save the cache
+
+        Args:
+            url: Page URL
+            headers: Response headers (for ETag and Last-Modified)
+            links: Links extracted from the page
+
+        Returns:
+            True if the link set differs from the cached one (or the page is new)
+        """
+        fingerprint = links_fingerprint(links)
+        with self.lock:
+            previous = self.pages.get(url)
+            self.pages[url] = {
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'links': links,
+                'links_sha256': fingerprint,
+                'fetched_at': time.time()
+            }
+        self.save()
+        return previous is None or previous.get('links_sha256') != fingerprint
+
+    def save(self) -> None:
+        """Write the cache to disk"""
+        with self.lock:
+            write_json_atomic(self.cache_file, self.pages, indent=4, ensure_ascii=False)
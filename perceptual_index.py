@@ -0,0 +1,160 @@
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from download_manifest import file_digest
+from json_store import load_json, write_json_atomic
+from image_utils import dhash, hamming_distance, image_size, is_image_file
+
+DEFAULT_INDEX_FILE = 'results/perceptual_index.json'
+# Maximum distance between 64-bit hashes for an image to be a candidate
+DEFAULT_MAX_DISTANCE = 1
+# Candidates are confirmed with a 1024-bit hash, which sees small marks (a red X, a changed label)
+# that the 8x8 grid averages away
+CONFIRM_HASH_SIZE = 32
+DEFAULT_CONFIRM_DISTANCE = 8
+# Largest relative difference in aspect ratio between confirmed near-duplicates
+MAX_ASPECT_DIFFERENCE = 0.02
+
+
+class PerceptualIndex:
+    """
+    Perceptual hash index over extracted slide images
+
+    Each indexed image records its SHA-256 and difference hash, so an image
+    whose exact hash has no cached caption can still be matched to a
+    near-duplicate (rescaled or re-encoded copy) that does. A match needs a
+    64-bit hash within max_distance, the same aspect ratio and a 1024-bit hash
+    within confirm_distance, so diagrams that differ only in a small mark are
+    not confused. Entries are keyed by path and reused while the file's size
+    and mtime are unchanged.
+    """
+
+    def __init__(self, index_file: str = DEFAULT_INDEX_FILE, max_distance: int = DEFAULT_MAX_DISTANCE,
+                 confirm_distance: int = DEFAULT_CONFIRM_DISTANCE):
+        self.index_file = index_file
+        self.max_distance = max_distance
+        self.confirm_distance = confirm_distance
+        self.entries: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.load()
+
+    def load(self) -> None:
+        """Load the index from disk"""
+        self.entries = load_json(self.index_file, {}, label='perceptual index')
+
+    def save(self) -> None:
+        """Write the index to disk if it changed"""
+        with self.lock:
+            if not self.dirty:
+                return
+            data = dict(self.entries)
+            self.dirty = False
+        write_json_atomic(self.index_file, data)
+
+    def add(self, image_path: str) -> Optional[Dict]:
+        """
+        Index an image, reusing the stored hashes if the file is unchanged
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            Entry with 'sha256', 'width', 'height', 'dhash' and 'dhash_fine' (hex),
+            or None if the image cannot be read
+        """
+        path = os.path.normpath(image_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self.lock:
+            entry = self.entries.get(path)
+        # Entries written before the confirmation hash existed are recomputed
+        if (entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime
+                and 'dhash_fine' in entry):
+            return entry
+
+        try:
+            width, height = image_size(path)
+            entry = {
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+                'sha256': file_digest(path),
+                'width': width,
+                'height': height,
+                'dhash': format(dhash(path), '016x'),
+                'dhash_fine': format(dhash(path, CONFIRM_HASH_SIZE), f'0{CONFIRM_HASH_SIZE * CONFIRM_HASH_SIZE // 4}x')
+            }
+        except Exception as e:
+            print(f"Warning: Could not hash image {path}: {str(e)}")
+            return None
+
+        with self.lock:
+            self.entries[path] = entry
+            self.dirty = True
+        return entry
+
+    def build(self, root: str = 'output') -> int:
+        """
+        Index every image under a directory, skipping bookkeeping directories such as .partial
+
+        Returns:
+            Number of indexed images
+        """
+        count = 0
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [dirname for dirname in dirnames if not dirname.startswith('.')]
+            for filename in filenames:
+                if is_image_file(filename) and self.add(os.path.join(dirpath, filename)):
+                    count += 1
+
+        # Drop entries for images that no longer exist
+        with self.lock:
+            missing = [path for path in self.entries if not os.path.exists(path)]
+            for path in missing:
+                del self.entries[path]
+            if missing:
+                self.dirty = True
+        return count
+
+    def find_similar(self, entry: Dict, max_distance: Optional[int] = None) -> List[Tuple[int, str]]:
+        """
+        Find indexed images that are near-duplicates of an entry
+
+        Args:
+            entry: Entry returned by add()
+            max_distance: Maximum Hamming distance of the 64-bit hashes (defaults to the index setting)
+
+        Returns:
+            (distance, sha256) pairs of other images, closest first
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        target = int(entry['dhash'], 16)
+
+        with self.lock:
+            candidates = list(self.entries.values())
+
+        matches = {}
+        for candidate in candidates:
+            if candidate['sha256'] == entry['sha256'] or 'dhash_fine' not in candidate:
+                continue
+            distance = hamming_distance(target, int(candidate['dhash'], 16))
+            if distance <= max_distance and self._confirmed(entry, candidate):
+                sha256 = candidate['sha256']
+                matches[sha256] = min(distance, matches.get(sha256, distance))
+        return sorted((distance, sha256) for sha256, distance in matches.items())
+
+    def _confirmed(self, entry: Dict, candidate: Dict) -> bool:
+        """Second check for a candidate: same aspect ratio and a close 1024-bit hash"""
+        aspect = entry['width'] / entry['height']
+        candidate_aspect = candidate['width'] / candidate['height']
+        if abs(aspect - candidate_aspect) > MAX_ASPECT_DIFFERENCE * aspect:
+            return False
+        fine_distance = hamming_distance(int(entry['dhash_fine'], 16), int(candidate['dhash_fine'], 16))
+        return fine_distance <= self.confirm_distance
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,166 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+from mineru_client import MinerUClient
+from download_pool import DownloadPool
+from llm_client import ImageCaptionAgent
+
+# Tasks submitted per create request, so polling can start before the whole course is submitted
+DEFAULT_SUBMIT_GROUP_SIZE = 20
+# Downloaded results waiting for captioning; a full queue holds back download workers
+DEFAULT_CAPTION_QUEUE_SIZE = 8
+
+
+class SlidePipeline:
+    """
+    Run submission, waiting, download and captioning as overlapping stages
+
+    A submitter thread creates tasks in small groups and hands their names to
+    the waiter over a queue, the waiter polls everything submitted so far and
+    queues each finished task on the download pool, and a captioner thread
+    captions each result as soon as its download completes. Each deck moves
+    on as soon as its previous stage is done instead of waiting for the whole
+    course at every phase.
+    """
+
+    def __init__(self, client: MinerUClient, pool: DownloadPool,
+                 caption_agent: Optional[ImageCaptionAgent] = None,
+                 submit_group_size: int = DEFAULT_SUBMIT_GROUP_SIZE,
+                 caption_queue_size: int = DEFAULT_CAPTION_QUEUE_SIZE,
+                 timeout: int = 600):
+        self.client = client
+        self.pool = pool
+        self.caption_agent = caption_agent
+        self.submit_group_size = submit_group_size
+        self.caption_queue_size = caption_queue_size
+        self.timeout = timeout
+
+    def run_slides(self, slides: List[Dict]) -> Dict[str, int]:
+        """
+        Process slides scraped from a course website
+
+        Args:
+            slides: List of dicts with 'url' and 'name' keys, and optionally 'course'
+
+        Returns:
+            Counts of completed, failed, downloaded and captioned tasks
+        """
+        def submit(group: List[Dict]) -> List[str]:
+            self.client.create_tasks(group, is_ocr=True, enable_formula=True, enable_table=True, language='en')
+            return [slide['name'] for slide in group]
+
+        return self._run(slides, submit)
+
+    def run_local_files(self, files: List[Tuple[str, Optional[str]]]) -> Dict[str, int]:
+        """
+        Process local PDF files
+
+        Args:
+            files: List of (file_path, name) tuples; name defaults to the file name
+
+        Returns:
+            Counts of completed, failed, downloaded and captioned tasks
+        """
+        def submit(group: List[Tuple[str, Optional[str]]]) -> List[str]:
+            self.client.create_local_file_tasks(group, is_ocr=True, enable_formula=True, enable_table=True,
+                                                language='en')
+            return [name or os.path.basename(file_path) for file_path, name in group]
+
+        return self._run(files, submit)
+
+    def _run(self, items: List, submit: Callable[[List], List[str]]) -> Dict[str, int]:
+        start_time = time.time()
+        stats = {'completed': 0, 'failed': 0, 'downloaded': 0, 'captioned': 0}
+        stats_lock = threading.Lock()
+
+        submitted: 'queue.Queue[Optional[List[str]]]' = queue.Queue()
+        to_caption: 'queue.Queue[Optional[str]]' = queue.Queue(maxsize=self.caption_queue_size)
+
+        submitter = threading.Thread(target=self._submit_stage, args=(items, submit, submitted),
+                                     name='pipeline-submit', daemon=True)
+        submitter.start()
+
+        captioner = None
+        if self.caption_agent is not None:
+            captioner = threading.Thread(target=self._caption_stage, args=(to_caption, stats, stats_lock),
+                                         name='pipeline-caption', daemon=True)
+            captioner.start()
+
+        # Download callbacks can still be running after pool.wait() returns, so count them
+        callbacks_pending = [0]
+        callbacks_done = threading.Condition()
+
+        def downloaded(future: Future) -> None:
+            # Runs on the download worker; a full caption queue makes it wait here
+            try:
+                result = future.result()
+                if result['success']:
+                    with stats_lock:
+                        stats['downloaded'] += 1
+                    if captioner is not None:
+                        to_caption.put(os.path.join('output', result['name']))
+            finally:
+                with callbacks_done:
+                    callbacks_pending[0] -= 1
+                    callbacks_done.notify_all()
+
+        try:
+            # Wait stage: runs on this thread and feeds the download pool
+            for name, result, error in self.client.wait_for_submitted_tasks(submitted, timeout=self.timeout):
+                if error is not None:
+                    stats['failed'] += 1
+                    print(f"\n✗ Failed: {name} - {str(error)}")
+                    continue
+
+                stats['completed'] += 1
+                print(f"\n✓ Completed: {name}")
+                if result and 'full_zip_url' in result:
+                    with callbacks_done:
+                        callbacks_pending[0] += 1
+                    self.pool.submit(name, result['full_zip_url']).add_done_callback(downloaded)
+                else:
+                    print(f"No download URL available for: {name}")
+        finally:
+            # Let downloads already queued and the captioner finish even if waiting failed
+            submitter.join()
+            self.pool.wait()
+            with callbacks_done:
+                callbacks_done.wait_for(lambda: callbacks_pending[0] == 0)
+
+            if captioner is not None:
+                to_caption.put(None)
+                captioner.join()
+
+        print(f"\nPipeline finished in {time.time() - start_time:.1f}s: {stats['completed']} completed, "
+              f"{stats['failed']} failed, {stats['downloaded']} downloaded, {stats['captioned']} captioned")
+        return stats
+
+    def _submit_stage(self, items: List, submit: Callable[[List], List[str]],
+                      submitted: 'queue.Queue[Optional[List[str]]]') -> None:
+        """Create tasks group by group, handing each group's names to the wait stage"""
+        try:
+            for i in range(0, len(items), self.submit_group_size):
+                group = items[i:i + self.submit_group_size]
+                try:
+                    submitted.put(submit(group))
+                except Exception as e:
+                    print(f"Error creating tasks: {str(e)}")
+        finally:
+            submitted.put(None)
+
+    def _caption_stage(self, to_caption: 'queue.Queue[Optional[str]]', stats: Dict[str, int],
+                       stats_lock: threading.Lock) -> None:
+        """Caption downloaded results in the order their downloads finish"""
+        while True:
+            directory_path = to_caption.get()
+            if directory_path is None:
+                break
+            try:
+                self.caption_agent.process_directory(directory_path)
+                with stats_lock:
+                    stats['captioned'] += 1
+            except Exception as e:
+                print(f"Error captioning {directory_path}: {str(e)}")
@@ -0,0 +1,84 @@
+import time
+import random
+from typing import Dict, Optional, Tuple
+
+# Default polling intervals in seconds
+PENDING_INTERVAL = 15.0     # Queued tasks rarely change state quickly
+RUNNING_INTERVAL = 5.0      # Running tasks before a page rate is known
+CONVERTING_INTERVAL = 3.0   # Conversion after extraction is usually short
+MIN_INTERVAL = 2.0
+MAX_INTERVAL = 30.0
+JITTER = 0.1                # +/- fraction applied to every interval
+
+
+class AdaptivePollingStrategy:
+    """
+    Choose per-task polling intervals from the task state and extraction progress
+
+    Queued tasks are polled slowly. Running tasks are polled at about half
+    their estimated time to completion, where the estimate comes from the page
+    rate observed in 'extract_progress'. Every interval gets random jitter so
+    tasks submitted together do not poll in lockstep.
+    """
+
+    def __init__(self, pending_interval: float = PENDING_INTERVAL, running_interval: float = RUNNING_INTERVAL,
+                 converting_interval: float = CONVERTING_INTERVAL, min_interval: float = MIN_INTERVAL,
+                 max_interval: float = MAX_INTERVAL, jitter: float = JITTER):
+        self.pending_interval = pending_interval
+        self.running_interval = running_interval
+        self.converting_interval = converting_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        # name -> (first_seen_time, first_pages, last_seen_time, last_pages)
+        self.progress_history: Dict[str, Tuple[float, int, float, int]] = {}
+
+    def observe(self, name: str, progress: Optional[Dict]) -> None:
+        """Record an 'extract_progress' observation for a task"""
+        if not progress or 'extracted_pages' not in progress:
+            return
+        now = time.monotonic()
+        pages = progress['extracted_pages']
+        if name not in self.progress_history:
+            self.progress_history[name] = (now, pages, now, pages)
+        else:
+            first_time, first_pages, _, _ = self.progress_history[name]
+            self.progress_history[name] = (first_time, first_pages, now, pages)
+
+    def estimate_remaining(self, name: str, progress: Optional[Dict]) -> Optional[float]:
+        """Estimate seconds until extraction finishes, or None if no page rate is known yet"""
+        history = self.progress_history.get(name)
+        if not history or not progress or not progress.get('total_pages'):
+            return None
+        first_time, first_pages, last_time, last_pages = history
+        if last_pages <= first_pages or last_time <= first_time:
+            return None
+        pages_per_sec = (last_pages - first_pages) / (last_time - first_time)
+        return max(progress['total_pages'] - last_pages, 0) / pages_per_sec
+
+    def next_interval(self, name: str, state: str, progress: Optional[Dict] = None) -> float:
+        """
+        Get the delay before the next status check of a task
+
+        Args:
+            name: Name of the tracked request
+            state: Current task state
+            progress: Latest 'extract_progress' data, if any
+
+        Returns:
+            Seconds to wait before polling the task again
+        """
+        if state == 'running':
+            remaining = self.estimate_remaining(name, progress)
+            interval = self.running_interval if remaining is None else remaining / 2
+        elif state == 'converting':
+            interval = self.converting_interval
+        else:
+            interval = self.pending_interval
+
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def forget(self, name: str) -> None:
+        """Drop progress history for a finished task"""
+        self.progress_history.pop(name, None)
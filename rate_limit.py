@@ -0,0 +1,63 @@
+import time
+import asyncio
+import threading
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that spreads requests smoothly over time
+
+    Tokens refill continuously at rate_per_minute / 60 per second up to
+    capacity. A caller that finds the bucket empty reserves its token and
+    sleeps only until that token has refilled, so concurrent callers queue up
+    in order instead of all waking at the start of the next minute.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute / 10.0)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Take tokens (possibly going into debt) and return how long to wait for them"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            self.tokens -= tokens
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until the requested tokens are available
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        wait_time = self._reserve(tokens)
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """
+        Wait without blocking the event loop until the requested tokens are available
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        wait_time = self._reserve(tokens)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        return wait_time
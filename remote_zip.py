@@ -0,0 +1,134 @@
+import io
+from typing import List, Optional, Tuple
+import requests
+
+# Minimum bytes fetched per uncached read, so zipfile's small reads don't each cost a request
+MIN_FETCH_SIZE = 64 * 1024
+
+
+class RangeNotSupportedError(Exception):
+    """Raised when the server ignores or rejects HTTP Range requests"""
+    pass
+
+
+class HttpRangeFile(io.RawIOBase):
+    """
+    Seekable read-only file over HTTP Range requests
+
+    Fetched byte ranges are kept as cached segments, so zipfile can read the
+    central directory and selected members without downloading the whole
+    archive. Call fetch() ahead of time to pull a known range in one request.
+    """
+
+    def __init__(self, url: str, session: requests.Session, size: int):
+        self.url = url
+        self.session = session
+        self.size = size
+        self.pos = 0
+        self.segments: List[Tuple[int, bytes]] = []
+        self.headers = {}
+        self.bytes_fetched = 0
+        self.requests_made = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self.pos = offset
+        elif whence == io.SEEK_CUR:
+            self.pos += offset
+        elif whence == io.SEEK_END:
+            self.pos = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if self.pos < 0:
+            raise ValueError("Negative seek position")
+        return self.pos
+
+    def fetch(self, start: int, end: int) -> None:
+        """
+        Fetch bytes [start, end) with a single Range request and cache them
+
+        Args:
+            start: First byte offset
+            end: Offset one past the last byte (clamped to the file size)
+        """
+        end = min(end, self.size)
+        if start >= end:
+            return
+
+        response = self.session.get(self.url, headers={'Range': f'bytes={start}-{end - 1}'})
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise RangeNotSupportedError(f"Server answered a Range request with {response.status_code}")
+
+        data = response.content
+        if len(data) != end - start:
+            raise RangeNotSupportedError(f"Expected {end - start} bytes, received {len(data)}")
+
+        self.segments.append((start, data))
+        self.bytes_fetched += len(data)
+        self.requests_made += 1
+
+    def _segment_at(self, pos: int) -> Optional[Tuple[int, bytes]]:
+        for start, data in self.segments:
+            if start <= pos < start + len(data):
+                return start, data
+        return None
+
+    def readinto(self, buffer) -> int:
+        if self.pos >= self.size:
+            return 0
+
+        segment = self._segment_at(self.pos)
+        if segment is None:
+            self.fetch(self.pos, self.pos + max(len(buffer), MIN_FETCH_SIZE))
+            segment = self._segment_at(self.pos)
+
+        start, data = segment
+        offset = self.pos - start
+        count = min(len(buffer), len(data) - offset)
+        buffer[:count] = data[offset:offset + count]
+        self.pos += count
+        return count
+
+    def read(self, size: int = -1) -> bytes:
+        # zipfile expects full reads, so keep reading across segment boundaries
+        if size is None or size < 0:
+            size = self.size - self.pos
+        chunks = []
+        while size > 0:
+            chunk = bytearray(size)
+            count = self.readinto(chunk)
+            if count == 0:
+                break
+            chunks.append(bytes(chunk[:count]))
+            size -= count
+        return b''.join(chunks)
+
+
+def open_remote_file(url: str, session: requests.Session) -> HttpRangeFile:
+    """
+    Open a remote file for ranged reads after checking that the server supports them
+
+    Raises:
+        RangeNotSupportedError: If the server does not advertise byte ranges or a size
+    """
+    response = session.head(url, allow_redirects=True)
+    response.raise_for_status()
+
+    if response.headers.get('Accept-Ranges', '').lower() != 'bytes':
+        raise RangeNotSupportedError("Server does not advertise byte range support")
+    if 'Content-Length' not in response.headers:
+        raise RangeNotSupportedError("Server did not report the file size")
+
+    remote = HttpRangeFile(response.url, session, int(response.headers['Content-Length']))
+    remote.headers = response.headers
+    return remote
@@ -0,0 +1,85 @@
+"""
+Compare the BeautifulSoup and streaming link extractors on large synthetic schedule pages
+
+Usage:
+    python scripts/benchmark_link_extraction.py [--terms 40] [--rows 200] [--repeat 3]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slide_scraper import SlideScraper, LINK_PARSERS
+
+BASE_URL = 'https://courses.example.edu/cse484/archive/'
+
+
+def make_schedule_page(terms: int, rows: int, seed: int = 0) -> str:
+    """Build an archive page with one schedule table per term, mixing PDF and non-PDF links"""
+    rng = random.Random(seed)
+    parts = ['<!DOCTYPE html><html><head><title>Course archive</title>',
+             '<style>td { padding: 4px; }</style></head><body><h1>Course archive</h1>']
+    for term in range(terms):
+        parts.append(f'<h2>Term {term}</h2><table class="schedule"><thead><tr>'
+                     '<th>Date</th><th>Topic</th><th>Materials</th></tr></thead><tbody>')
+        for row in range(rows):
+            parts.append(f'<tr><td>Week {row // 3 + 1}</td><td>Lecture {row}: topic &amp; notes '
+                         f'<em>{rng.randint(0, 10 ** 6)}</em></td><td>')
+            parts.append(f'<a href="slides/t{term}/lecture{row}.pdf"><b>Slides</b> {term}-{row}</a> | ')
+            parts.append(f'<a href="https://video.example.edu/t{term}/{row}">Video</a> | ')
+            parts.append(f'<a href="/handouts/t{term}-{row}.pdf"></a>')
+            parts.append('</td></tr>')
+        parts.append('</tbody></table>')
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def run(scraper: SlideScraper, html: str, repeat: int):
+    """Best wall time and peak traced memory of extract_slide_links over several runs"""
+    best = float('inf')
+    links = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        links = scraper.extract_slide_links(html)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    scraper.extract_slide_links(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, links
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark schedule page link extraction')
+    parser.add_argument('--terms', type=int, default=40, help='Schedule tables on the page (default: 40)')
+    parser.add_argument('--rows', type=int, default=200, help='Rows per schedule table (default: 200)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per parser; the best is reported (default: 3)')
+    args = parser.parse_args()
+
+    html = make_schedule_page(args.terms, args.rows)
+    print(f"Synthetic page: {len(html) / 1024 / 1024:.1f} MiB, {args.terms} terms x {args.rows} rows")
+
+    results = {}
+    for name in LINK_PARSERS:
+        scraper = SlideScraper.__new__(SlideScraper)
+        scraper.base_url = BASE_URL
+        scraper.link_parser = name
+        results[name] = run(scraper, html, args.repeat)
+
+    baseline = results[LINK_PARSERS[0]]
+    for name, (seconds, peak, links) in results.items():
+        print(f"{name:>8}: {seconds:.3f}s, peak {peak / 1024 / 1024:.1f} MiB, {len(links)} links, "
+              f"{baseline[0] / seconds:.1f}x speed")
+
+    if any(links != baseline[2] for _, _, links in results.values()):
+        print("Warning: parsers returned different links")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
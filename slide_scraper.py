@@ -1,13 +1,99 @@
 import requests
 from bs4 import BeautifulSoup
 import os
-from urllib.parse import urljoin
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urldefrag, urlparse
 import re
+from http_session import get_shared_session
+from page_cache import PageCache
 
-class SlideScraper:
+# Crawler politeness defaults
+DEFAULT_CRAWL_WORKERS = 8       # Schedule pages fetched at once across all hosts
+DEFAULT_PER_HOST_LIMIT = 2      # Schedule pages fetched at once from one host
+DEFAULT_PER_HOST_DELAY = 1.0    # Minimum seconds between requests to one host
+
+# Link extraction backends: a full BeautifulSoup tree, or an incremental HTMLParser fed from the streamed response
+LINK_PARSERS = ('soup', 'stream')
+DEFAULT_LINK_PARSER = 'soup'
+STREAM_CHUNK_SIZE = 64 * 1024
+
+class PDFLinkParser(HTMLParser):
+    """
+    Incremental parser that collects PDF links without building a document tree
+    
+    Only anchor tags and the text inside them are kept, so memory stays flat
+    however large the page is. Links come out in document order with the same
+    url/name rules as SlideScraper.extract_slide_links.
+    """
+    
     def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
         self.base_url = base_url
-        self.session = requests.Session()
+        self.links: List[Dict] = []
+        # Open anchors as [href, text parts]; text inside nested anchors counts for every open one
+        self._open: List[list] = []
+        self._anchors: List[list] = []
+    
+    def handle_starttag(self, tag, attrs):
+        if tag != 'a':
+            return
+        href = dict(attrs).get('href')
+        anchor = [href, []]
+        self._open.append(anchor)
+        self._anchors.append(anchor)
+    
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._open:
+            self._open.pop()
+            if not self._open:
+                self._flush()
+    
+    def handle_data(self, data):
+        for _, text in self._open:
+            text.append(data)
+    
+    def close(self):
+        super().close()
+        self._open = []
+        self._flush()
+    
+    def _flush(self):
+        for href, text in self._anchors:
+            if href and href.endswith('.pdf'):
+                link_text = ''.join(text)
+                self.links.append({
+                    'url': urljoin(self.base_url, href),
+                    'name': link_text.strip() if link_text else os.path.basename(href)
+                })
+        self._anchors = []
+
+def course_slug(course_url: str) -> str:
+    """
+    Short stable identifier for a course schedule URL
+
+    e.g. https://courses.example.edu/cse484/25sp/schedule/index.html
+    -> courses.example.edu-cse484-25sp-schedule
+    """
+    parts = urlparse(course_url)
+    path = re.sub(r'/(index|default)\.\w+$', '', parts.path)
+    host = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+    return re.sub(r'[^A-Za-z0-9.]+', '-', f"{host}{path}").strip('-')
+
+class SlideScraper:
+    def __init__(self, base_url, session=None, page_cache: Optional[PageCache] = None,
+                 link_parser: str = DEFAULT_LINK_PARSER):
+        if link_parser not in LINK_PARSERS:
+            raise Exception(f"Unknown link parser: {link_parser} (expected one of {', '.join(LINK_PARSERS)})")
+        self.base_url = base_url
+        self.session = session or get_shared_session()
+        self.page_cache = page_cache
+        self.link_parser = link_parser
+        # Whether the last fetch_links() found a link set different from the cached one
+        self.links_changed = True
         self.download_dir = "slides"
         
         # Create download directory if it doesn't exist
@@ -20,8 +106,50 @@ class SlideScraper:
         response.raise_for_status()
         return response.text
 
+    def fetch_links(self) -> List[Dict]:
+        """
+        Fetch the schedule page and extract its slide links
+        
+        With a page cache, the request is conditional: a 304 Not Modified
+        reuses the cached links without parsing the page.
+        """
+        cached = self.page_cache.get(self.base_url) if self.page_cache is not None else None
+        headers = self.page_cache.conditional_headers(self.base_url) if cached else {}
+        with self.session.get(self.base_url, headers=headers, stream=self.link_parser == 'stream') as response:
+            if response.status_code == 304 and cached:
+                print(f"Schedule page not modified: {self.base_url}")
+                self.links_changed = False
+                return cached['links']
+            response.raise_for_status()
+            links = self._links_from_response(response)
+        
+        if self.page_cache is None:
+            self.links_changed = True
+        else:
+            self.links_changed = self.page_cache.put(self.base_url, response.headers, links)
+        return links
+
+    def _links_from_response(self, response) -> List[Dict]:
+        """Extract links from a response, feeding the streaming parser chunk by chunk"""
+        if self.link_parser != 'stream':
+            return self.extract_slide_links(response.text)
+        
+        if response.encoding is None:
+            response.encoding = 'utf-8'
+        parser = PDFLinkParser(self.base_url)
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE, decode_unicode=True):
+            parser.feed(chunk)
+        parser.close()
+        return parser.links
+
     def extract_slide_links(self, html_content):
         """Extract all PDF slide links from the schedule page"""
+        if self.link_parser == 'stream':
+            parser = PDFLinkParser(self.base_url)
+            parser.feed(html_content)
+            parser.close()
+            return parser.links
+        
         soup = BeautifulSoup(html_content, 'html.parser')
         slide_links = []
         
@@ -80,8 +208,7 @@ class SlideScraper:
         print(f"Slides are saved in the '{self.download_dir}' directory")
 
     def get_links(self, keyword):
-        html_content = self.get_schedule_page()
-        links = self.extract_slide_links(html_content)
+        links = self.fetch_links()
         if keyword is None:
             return links
 
@@ -89,6 +216,114 @@ class SlideScraper:
         return [link for link in links if keyword in link['name'] and "inked" not in link['name']]
             
 
+
+class CourseCrawler:
+    """
+    Scrape slide links from many course schedule pages concurrently
+
+    Pages are fetched on a thread pool, with at most per_host_limit requests
+    in flight to one host and at least per_host_delay seconds between request
+    starts to the same host. Links from all pages are merged into one list:
+    a PDF linked from several pages is kept once, tagged with the course
+    whose URL sorts first. Every slide is named "<course slug>_<link text>",
+    so the same link text on two courses never collides and a course's
+    slide names are the same whether it is crawled alone or with others.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_CRAWL_WORKERS, per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+                 per_host_delay: float = DEFAULT_PER_HOST_DELAY, session: Optional[requests.Session] = None,
+                 page_cache: Optional[PageCache] = None, link_parser: str = DEFAULT_LINK_PARSER):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.per_host_delay = per_host_delay
+        self.session = session or get_shared_session()
+        self.page_cache = page_cache
+        self.link_parser = link_parser
+        # Course URLs whose link set changed during the last crawl()
+        self.changed_courses: List[str] = []
+        self.lock = threading.Lock()
+        self.host_limits: Dict[str, threading.Semaphore] = {}
+        self.host_next_start: Dict[str, float] = {}
+
+    def _host_limit(self, host: str) -> threading.Semaphore:
+        with self.lock:
+            if host not in self.host_limits:
+                self.host_limits[host] = threading.Semaphore(self.per_host_limit)
+            return self.host_limits[host]
+
+    def _wait_for_host(self, host: str) -> None:
+        """Reserve the next request slot for a host and sleep until it starts"""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.host_next_start.get(host, now))
+            self.host_next_start[host] = start + self.per_host_delay
+        time.sleep(max(start - time.monotonic(), 0))
+
+    def _scrape(self, course_url: str, keyword: Optional[str]) -> List[Dict]:
+        host = urlparse(course_url).netloc
+        with self._host_limit(host):
+            self._wait_for_host(host)
+            scraper = SlideScraper(course_url, session=self.session, page_cache=self.page_cache,
+                                   link_parser=self.link_parser)
+            try:
+                links = scraper.get_links(keyword)
+            except Exception as e:
+                print(f"Error scraping {course_url}: {str(e)}")
+                return []
+        if scraper.links_changed:
+            with self.lock:
+                self.changed_courses.append(course_url)
+        print(f"Found {len(links)} slides on {course_url}")
+        return links
+
+    def crawl(self, course_urls: List[str], keyword: Optional[str] = None) -> List[Dict]:
+        """
+        Scrape several course schedule pages into one de-duplicated slide list
+
+        Slide names are prefixed with the course slug, so a name depends only
+        on its own course page and never on the other courses or on which
+        pages failed to load.
+
+        Args:
+            course_urls: Course schedule URLs
+            keyword: Keyword to filter slides by name (see SlideScraper.get_links)
+
+        Returns:
+            List of dicts with 'url', 'name' and 'course' keys
+        """
+        course_urls = list(dict.fromkeys(course_urls))
+        self.changed_courses = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pages = list(executor.map(lambda course_url: self._scrape(course_url, keyword), course_urls))
+
+        slides = []
+        seen_urls = set()
+        # A PDF linked from several courses goes to the first one in URL order, not input order
+        for course_url, links in sorted(zip(course_urls, pages), key=lambda page: page[0]):
+            slug = course_slug(course_url)
+            used_names = set()
+            for link in links:
+                pdf_url = urldefrag(link['url'])[0]
+                if pdf_url in seen_urls:
+                    continue
+                seen_urls.add(pdf_url)
+
+                # Link texts repeated within one course fall back to the file name, then a counter
+                name = link['name']
+                if name in used_names:
+                    name = os.path.basename(urlparse(pdf_url).path) or name
+                base_name, suffix = name, 2
+                while name in used_names:
+                    name = f"{base_name}-{suffix}"
+                    suffix += 1
+                used_names.add(name)
+
+                slides.append({'url': pdf_url, 'name': f"{slug}_{name}", 'course': course_url})
+
+        print(f"Found {len(slides)} unique slides across {len(course_urls)} courses")
+        return slides
+
+
 if __name__ == "__main__":
     # Example usage
     course_url = "https://courses.cs.washington.edu/courses/cse484/25sp/schedule/"
@@ -0,0 +1,117 @@
+import os
+import json
+from typing import Dict, List
+from json_store import write_json_atomic
+
+# Compact once the journal holds this many records (or more records than the snapshot)
+DEFAULT_COMPACT_THRESHOLD = 500
+
+
+class StateJournal:
+    """
+    Append-only write-ahead journal for task state
+
+    The snapshot file (e.g. results/result.json) keeps its original format: a
+    JSON list of tracked requests. Every state change is appended as one JSON
+    line to '<snapshot>.journal', and loading replays the journal over the
+    snapshot. Compaction rewrites the snapshot through an atomic rename and
+    then truncates the journal; replaying records over a newer snapshot is
+    idempotent, so a crash at any point leaves a loadable state.
+
+    Loading is eager: load() reads the whole snapshot and replays the whole
+    journal, because every client command looks tasks up by name. What the
+    journal saves is the per-change rewrite; startup stays one linear read,
+    and compaction keeps the journal no longer than the snapshot.
+    """
+
+    def __init__(self, snapshot_path: str, compact_threshold: int = DEFAULT_COMPACT_THRESHOLD):
+        self.snapshot_path = snapshot_path
+        self.journal_path = f"{snapshot_path}.journal"
+        self.compact_threshold = compact_threshold
+        self.journal_records = 0
+        self.snapshot_records = 0
+        self._journal_file = None
+
+    def load(self) -> Dict[str, Dict]:
+        """
+        Load the snapshot and replay the journal over it
+
+        Returns:
+            Dict mapping request names to their stored entries
+        """
+        entries: Dict[str, Dict] = {}
+
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r') as f:
+                for req in json.load(f):
+                    entries[req['name']] = req
+        self.snapshot_records = len(entries)
+
+        self.journal_records = 0
+        if os.path.exists(self.journal_path):
+            valid_length = 0
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b'\n'):
+                            raise json.JSONDecodeError("Unterminated record", line.decode(errors='replace'), len(line))
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from an interrupted write; everything before it is intact
+                        break
+                    if record['op'] == 'put':
+                        entries[record['name']] = {'name': record['name'], **record['entry']}
+                    elif record['op'] == 'delete':
+                        entries.pop(record['name'], None)
+                    self.journal_records += 1
+                    valid_length += len(line)
+                torn = f.read(1) != b'' or valid_length != f.tell()
+
+            if torn:
+                # Drop the torn tail so new records are not appended onto it
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(valid_length)
+
+        return entries
+
+    def append_put(self, name: str, entry: Dict) -> None:
+        """Record the full current entry for a request"""
+        self._append({'op': 'put', 'name': name, 'entry': entry})
+
+    def append_delete(self, name: str) -> None:
+        """Record the removal of a request"""
+        self._append({'op': 'delete', 'name': name})
+
+    def needs_compaction(self) -> bool:
+        """Whether the journal has grown enough to be folded into the snapshot"""
+        return self.journal_records >= max(self.compact_threshold, self.snapshot_records)
+
+    def compact(self, requests: List[Dict]) -> None:
+        """
+        Write a fresh snapshot atomically and truncate the journal
+
+        Args:
+            requests: Complete list of tracked requests to snapshot
+        """
+        write_json_atomic(self.snapshot_path, requests, fsync=True, indent=4)
+
+        self.close()
+        open(self.journal_path, 'w').close()
+        self.journal_records = 0
+        self.snapshot_records = len(requests)
+
+    def close(self) -> None:
+        """Close the journal file handle if it is open"""
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+    def _append(self, record: Dict) -> None:
+        if self._journal_file is None:
+            directory = os.path.dirname(self.journal_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._journal_file = open(self.journal_path, 'a')
+        self._journal_file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._journal_file.flush()
+        self.journal_records += 1
@@ -0,0 +1,215 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import os
+import json
+import sqlite3
+import threading
+from state_journal import StateJournal
+
+# Results file extensions that select the SQLite backend
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+
+class TaskStore(ABC):
+    """Abstract base class for persistent task state storage"""
+
+    @abstractmethod
+    def load(self) -> Dict[str, Dict]:
+        """Load all stored tasks as a dict of name -> entry"""
+        pass
+
+    @abstractmethod
+    def put(self, name: str, entry: Dict) -> None:
+        """Insert or replace the stored entry for a task"""
+        pass
+
+    @abstractmethod
+    def delete(self, name: str) -> None:
+        """Remove a task from the store"""
+        pass
+
+    @abstractmethod
+    def save_all(self, requests: List[Dict]) -> None:
+        """Persist the complete list of tracked requests"""
+        pass
+
+    @abstractmethod
+    def query(self, states: Optional[List[str]] = None, course: Optional[str] = None,
+              created_after: Optional[float] = None) -> List[str]:
+        """
+        Find task names matching the given filters, ordered by creation time
+
+        Args:
+            states: Only include tasks in one of these states
+            course: Only include tasks scraped from this course URL
+            created_after: Only include tasks created after this timestamp
+
+        Returns:
+            List of matching task names
+        """
+        pass
+
+    def needs_compaction(self) -> bool:
+        """Whether the store wants a full save_all() to fold in its incremental writes"""
+        return False
+
+    def close(self) -> None:
+        """Release any resources held by the store"""
+        pass
+
+
+class JournalTaskStore(TaskStore):
+    """JSON snapshot plus append-only journal (the default results/result.json format)"""
+
+    def __init__(self, results_file: str):
+        self.journal = StateJournal(results_file)
+        self.entries: Dict[str, Dict] = {}
+
+    def load(self) -> Dict[str, Dict]:
+        self.entries = self.journal.load()
+        return self.entries
+
+    def put(self, name: str, entry: Dict) -> None:
+        self.entries[name] = {'name': name, **entry}
+        self.journal.append_put(name, entry)
+
+    def delete(self, name: str) -> None:
+        self.entries.pop(name, None)
+        self.journal.append_delete(name)
+
+    def save_all(self, requests: List[Dict]) -> None:
+        self.journal.compact(requests)
+        self.entries = {req['name']: req for req in requests}
+
+    def needs_compaction(self) -> bool:
+        return self.journal.needs_compaction()
+
+    def query(self, states: Optional[List[str]] = None, course: Optional[str] = None,
+              created_after: Optional[float] = None) -> List[str]:
+        matches = [
+            entry for entry in self.entries.values()
+            if (states is None or entry['state'] in states)
+            and (course is None or entry.get('course') == course)
+            and (created_after is None or entry['created_at'] > created_after)
+        ]
+        return [entry['name'] for entry in sorted(matches, key=lambda entry: entry['created_at'])]
+
+    def close(self) -> None:
+        self.journal.close()
+
+
+class SQLiteTaskStore(TaskStore):
+    """SQLite task store indexed by state, creation time and source course"""
+
+    def __init__(self, db_path: str, migrate_from: Optional[str] = None):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Polling and download threads share one connection, serialized by the lock
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                name TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                course TEXT,
+                created_at REAL NOT NULL,
+                entry TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks (state, created_at);
+            CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at);
+            CREATE INDEX IF NOT EXISTS idx_tasks_course ON tasks (course, created_at);
+        """)
+        self.conn.commit()
+
+        if migrate_from:
+            self._migrate(migrate_from)
+
+    def _migrate(self, results_file: str) -> None:
+        """Import an existing JSON results file and its journal the first time the database is used"""
+        with self.lock:
+            if self.conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone():
+                return
+
+        previous_requests = StateJournal(results_file).load()
+        if not previous_requests:
+            return
+
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO tasks (name, state, course, created_at, entry) VALUES (?, ?, ?, ?, ?)",
+                [self._row(name, req) for name, req in previous_requests.items()]
+            )
+        print(f"Migrated {len(previous_requests)} tasks from {results_file} to {self.db_path}")
+
+    @staticmethod
+    def _row(name: str, entry: Dict) -> tuple:
+        entry = {key: value for key, value in entry.items() if key not in ('name', 'state_description')}
+        return (name, entry['state'], entry.get('course'), entry['created_at'], json.dumps(entry))
+
+    def load(self) -> Dict[str, Dict]:
+        with self.lock:
+            rows = self.conn.execute("SELECT name, entry FROM tasks ORDER BY created_at").fetchall()
+        return {name: {'name': name, **json.loads(entry)} for name, entry in rows}
+
+    def put(self, name: str, entry: Dict) -> None:
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO tasks (name, state, course, created_at, entry) VALUES (?, ?, ?, ?, ?)",
+                self._row(name, entry)
+            )
+
+    def delete(self, name: str) -> None:
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM tasks WHERE name = ?", (name,))
+
+    def save_all(self, requests: List[Dict]) -> None:
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM tasks")
+            self.conn.executemany(
+                "INSERT INTO tasks (name, state, course, created_at, entry) VALUES (?, ?, ?, ?, ?)",
+                [self._row(req['name'], req) for req in requests]
+            )
+
+    def query(self, states: Optional[List[str]] = None, course: Optional[str] = None,
+              created_after: Optional[float] = None) -> List[str]:
+        clauses, params = [], []
+        if states is not None:
+            clauses.append(f"state IN ({', '.join('?' for _ in states)})")
+            params.extend(states)
+        if course is not None:
+            clauses.append("course = ?")
+            params.append(course)
+        if created_after is not None:
+            clauses.append("created_at > ?")
+            params.append(created_after)
+
+        sql = "SELECT name FROM tasks"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at"
+
+        with self.lock:
+            return [name for (name,) in self.conn.execute(sql, params)]
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+def open_task_store(results_file: str) -> TaskStore:
+    """
+    Open the task store for a results file, choosing the backend by extension
+
+    A '.db', '.sqlite' or '.sqlite3' path selects SQLite; on first use it imports
+    the JSON results file with the same base name (e.g. results/result.json for
+    results/result.db). Any other path uses the JSON snapshot and journal.
+    """
+    base, extension = os.path.splitext(results_file)
+    if extension.lower() in SQLITE_EXTENSIONS:
+        return SQLiteTaskStore(results_file, migrate_from=f"{base}.json")
+    return JournalTaskStore(results_file)
@@ -0,0 +1,100 @@
+import io
+import re
+import zipfile
+from typing import Dict, List, Optional
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+def build_zip(members: Dict[str, bytes]) -> bytes:
+    """ZIP archive of the given members, stored uncompressed so byte offsets are predictable"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zip_ref:
+        for name, data in members.items():
+            zip_ref.writestr(name, data)
+    return buffer.getvalue()
+
+
+class FakeResponse:
+    """Just enough of requests.Response for the download code"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict, body: bytes = b'',
+                 drop_after: Optional[int] = None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.body = body
+        self.drop_after = drop_after
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def content(self) -> bytes:
+        return self.body
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error", response=self)
+
+    def iter_content(self, chunk_size: int = 1, decode_unicode: bool = False):
+        body = self.body if self.drop_after is None else self.body[:self.drop_after]
+        for i in range(0, len(body), chunk_size):
+            yield body[i:i + chunk_size]
+        if self.drop_after is not None:
+            raise requests.exceptions.ConnectionError("Connection reset by peer")
+
+    def __enter__(self) -> 'FakeResponse':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+class FakeFileServer:
+    """
+    Session stand-in serving one file, with optional Range support
+
+    GET requests honour Range and If-Range like a real server: a Range whose
+    If-Range validator no longer matches gets the whole file with a 200.
+    drops lists, per GET, how many body bytes to send before the connection
+    is cut (None sends everything).
+    """
+
+    def __init__(self, body: bytes, etag: str = '"v1"', ranges: bool = True):
+        self.body = body
+        self.etag = etag
+        self.ranges = ranges
+        self.drops: List[Optional[int]] = []
+        self.requests: List[Dict] = []
+
+    def _headers(self) -> Dict:
+        headers = {'ETag': self.etag, 'Content-Length': str(len(self.body))}
+        if self.ranges:
+            headers['Accept-Ranges'] = 'bytes'
+        return headers
+
+    def head(self, url: str, headers: Optional[Dict] = None, allow_redirects: bool = False) -> FakeResponse:
+        return FakeResponse(url, 200, self._headers())
+
+    def get(self, url: str, headers: Optional[Dict] = None, stream: bool = False) -> FakeResponse:
+        headers = dict(headers or {})
+        self.requests.append(headers)
+        drop_after = self.drops.pop(0) if self.drops else None
+
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', headers.get('Range', ''))
+        if not self.ranges or match is None or headers.get('If-Range', self.etag) != self.etag:
+            return FakeResponse(url, 200, self._headers(), self.body, drop_after)
+
+        start = int(match.group(1))
+        end = int(match.group(2)) + 1 if match.group(2) else len(self.body)
+        if start >= len(self.body):
+            return FakeResponse(url, 416, {'Content-Range': f"bytes */{len(self.body)}"})
+        body = self.body[start:end]
+        response_headers = {
+            'ETag': self.etag,
+            'Content-Length': str(len(body)),
+            'Content-Range': f"bytes {start}-{start + len(body) - 1}/{len(self.body)}"
+        }
+        return FakeResponse(url, 206, response_headers, body, drop_after)
@@ -0,0 +1,40 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_index import ContentIndex
+
+
+class ForgetTaskTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index_file = os.path.join(self.tmp.name, 'content_index.json')
+        self.index = ContentIndex(self.index_file)
+        self.index.record_task('lecture1', 'digest-1')
+        self.index.record_task('lecture2', 'digest-2')
+        self.index.record_alias('lecture1-copy', 'lecture1')
+        self.index.record_alias('lecture2-copy', 'lecture2')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_deleted_task_no_longer_owns_its_content_or_aliases(self):
+        self.assertEqual(self.index.forget_task('lecture1'), ['lecture1-copy'])
+        self.assertIsNone(self.index.task_for_digest('digest-1'))
+        self.assertIsNone(self.index.owner_of('lecture1-copy'))
+        self.assertEqual(self.index.task_for_digest('digest-2'), 'lecture2')
+        self.assertEqual(self.index.owner_of('lecture2-copy'), 'lecture2')
+
+    def test_forgetting_survives_a_reload(self):
+        self.index.forget_task('lecture1')
+        self.index.save()
+        reloaded = ContentIndex(self.index_file)
+        self.assertEqual(reloaded.contents, {'digest-2': 'lecture2'})
+        self.assertEqual(reloaded.aliases, {'lecture2-copy': 'lecture2'})
+
+
+if __name__ == '__main__':
+    unittest.main()
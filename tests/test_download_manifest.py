@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from download_manifest import file_digest, is_up_to_date, write_manifest
+
+ZIP_URL = 'https://cdn.example.com/results/abc.zip'
+
+
+class UpToDateTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.extract_dir = self.tmp.name
+        self.path = os.path.join(self.extract_dir, 'full.md')
+        with open(self.path, 'w') as f:
+            f.write('# Lecture 1\n')
+        files = {'full.md': {'size': os.path.getsize(self.path), 'sha256': file_digest(self.path)}}
+        write_manifest(self.extract_dir, ZIP_URL, {'ETag': '"v1"'}, ('markdown',), files)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_intact_files_are_up_to_date(self):
+        self.assertTrue(is_up_to_date(ZIP_URL, self.extract_dir, ('markdown',)))
+        self.assertTrue(is_up_to_date(ZIP_URL, self.extract_dir, ('markdown',), verify_hashes=True))
+
+    def test_same_size_edit_is_only_caught_when_verifying_hashes(self):
+        with open(self.path, 'w') as f:
+            f.write('# Lecture 2\n')
+        self.assertTrue(is_up_to_date(ZIP_URL, self.extract_dir, ('markdown',)))
+        self.assertFalse(is_up_to_date(ZIP_URL, self.extract_dir, ('markdown',), verify_hashes=True))
+
+    def test_missing_artifact_needs_a_download(self):
+        self.assertFalse(is_up_to_date(ZIP_URL, self.extract_dir, ('markdown', 'images')))
+
+
+if __name__ == '__main__':
+    unittest.main()
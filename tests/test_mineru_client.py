@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mineru_client import MinerUClient
+
+
+def make_client(directory: str) -> MinerUClient:
+    os.environ.setdefault('TOKEN', 'test-token')
+    return MinerUClient(results_file=os.path.join(directory, 'result.json'))
+
+
+class BatchMemberIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = make_client(self.tmp.name)
+
+    def tearDown(self):
+        self.client.store.close()
+        self.tmp.cleanup()
+
+    def test_matches_only_members_of_the_batch(self):
+        self.client.track_url_batch('batch-1', [{'name': 'a', 'url': 'https://x/a.pdf'},
+                                                 {'name': 'b', 'url': 'https://x/b.pdf'}], ['0-a', '1-b'])
+        self.client.track_url_batch('batch-2', [{'name': 'c', 'url': 'https://x/c.pdf'}], ['0-c'])
+
+        statuses = self.client.match_batch_members('batch-1', [{'data_id': '0-a', 'state': 'done'},
+                                                                {'data_id': '1-b', 'state': 'running'}])
+
+        self.assertEqual({name: status['state'] for name, status in statuses.items()},
+                         {'a': 'done', 'b': 'running'})
+
+    def test_deleted_and_reloaded_tasks_keep_the_index_in_step(self):
+        self.client.track_url_batch('batch-1', [{'name': 'a', 'url': 'https://x/a.pdf'},
+                                                 {'name': 'b', 'url': 'https://x/b.pdf'}], ['0-a', '1-b'])
+        self.client.delete_task('a')
+        self.assertEqual(self.client.batch_members, {'batch-1': ['b']})
+
+        self.client.store.close()
+        reloaded = make_client(self.tmp.name)
+        self.assertEqual(reloaded.batch_members, {'batch-1': ['b']})
+        reloaded.store.close()
+
+    def test_matching_while_another_thread_submits(self):
+        # Regression: matching used to iterate the tracker while the submitter inserted into it
+        for i in range(50000):
+            self.client.requests_tracker[f'old-{i}'] = self.client.new_batch_entry(
+                f'old-batch-{i}', f'0-old-{i}', f'https://x/old-{i}.pdf', 'done', is_local_file=False
+            )
+        self.client.track_url_batch('batch-0', [{'name': 'first', 'url': 'https://x/first.pdf'}], ['0-first'])
+
+        errors = []
+
+        def submit():
+            try:
+                for i in range(300):
+                    self.client.track_url_batch(f'batch-{i + 1}', [{'name': f'new-{i}', 'url': 'https://x/n.pdf'}],
+                                                 [f'0-new-{i}'])
+            except Exception as e:
+                errors.append(e)
+
+        # Switch threads as often as possible so the two threads interleave
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        submitter = threading.Thread(target=submit)
+        submitter.start()
+        try:
+            while submitter.is_alive():
+                statuses = self.client.match_batch_members('batch-0', [{'data_id': '0-first', 'state': 'done'}])
+                self.assertEqual(list(statuses), ['first'])
+                self.client.get_tracked_requests()
+        finally:
+            submitter.join()
+            sys.setswitchinterval(switch_interval)
+        self.assertEqual(errors, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import zipper
+from download_manifest import load_manifest
+from remote_zip import HttpRangeFile, RangeNotSupportedError, open_remote_file
+from tests.fake_http import FakeFileServer, build_zip
+
+ZIP_URL = 'https://cdn.example.com/results/abc.zip'
+MEMBERS = {
+    'abc_origin.pdf': os.urandom(300000),
+    'full.md': b'# Lecture 1\n' * 200,
+    'images/figure.jpg': os.urandom(20000),
+    'layout.json': b'{"pdf_info": []}' * 1000,
+    'abc_content_list.json': b'[]',
+}
+
+
+def range_size(range_header: str) -> int:
+    start, end = map(int, range_header[len('bytes='):].split('-'))
+    return end - start + 1
+
+
+class HttpRangeFileTest(unittest.TestCase):
+    def test_reads_across_fetched_segments(self):
+        body = bytes(range(256)) * 1000
+        server = FakeFileServer(body)
+        remote = open_remote_file(ZIP_URL, server)
+        remote.fetch(1000, 2000)
+        remote.seek(1500)
+        self.assertEqual(remote.read(1000), body[1500:2500])
+        remote.seek(-10, os.SEEK_END)
+        self.assertEqual(remote.read(), body[-10:])
+        self.assertEqual(remote.requests_made, 3)
+
+    def test_server_ignoring_range_is_rejected(self):
+        server = FakeFileServer(b'x' * 1000, ranges=False)
+        with self.assertRaises(RangeNotSupportedError):
+            open_remote_file(ZIP_URL, server)
+        with self.assertRaises(RangeNotSupportedError):
+            HttpRangeFile(ZIP_URL, server, 1000).fetch(0, 100)
+
+
+class SelectiveExtractionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.extract_dir = os.path.join('output', 'lecture1')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def download(self, server):
+        return zipper.download_and_extract_zip(ZIP_URL, 'lecture1', session=server,
+                                               artifacts=('markdown', 'images'), skip_unchanged=False)
+
+    def assert_only_selected_members(self):
+        for name in ('full.md', 'images/figure.jpg'):
+            with open(os.path.join(self.extract_dir, name), 'rb') as f:
+                self.assertEqual(f.read(), MEMBERS[name])
+        for name in ('abc_origin.pdf', 'layout.json', 'abc_content_list.json'):
+            self.assertFalse(os.path.exists(os.path.join(self.extract_dir, name)))
+        manifest = load_manifest(self.extract_dir)
+        self.assertEqual(sorted(manifest['files']), ['full.md', 'images/figure.jpg'])
+        self.assertEqual(manifest['artifacts'], ['markdown', 'images'])
+
+    def test_fetches_only_the_selected_members(self):
+        server = FakeFileServer(build_zip(MEMBERS))
+
+        self.assertIsNotNone(self.download(server))
+
+        self.assert_only_selected_members()
+        self.assertTrue(all('Range' in headers for headers in server.requests))
+        fetched = sum(range_size(headers['Range']) for headers in server.requests)
+        self.assertLess(fetched, len(MEMBERS['abc_origin.pdf']))
+
+    def test_falls_back_to_a_full_download_without_range_support(self):
+        server = FakeFileServer(build_zip(MEMBERS), ranges=False)
+
+        self.assertIsNotNone(self.download(server))
+
+        self.assertEqual(server.requests, [{}])
+        self.assert_only_selected_members()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import codecs
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slide_scraper import CourseCrawler, SlideScraper
+from tests.fake_http import FakeResponse
+
+COURSE_URL = 'https://courses.example.edu/cse484/25sp/schedule/'
+SCHEDULE_PAGE = """<html><head><title>CSE 484 &amp; M 584</title></head><body>
+<table>
+  <tr><td>Mar 31</td><td><a href="slides/lecture1.pdf">Lecture 1: Intro &amp; Threat Models</a></td></tr>
+  <tr><td>Apr 2</td><td><a href="slides/lecture2.pdf">
+      <b>Lecture 2</b>: Software <i>Security</i>
+  </a> (<a href="slides/lecture2-inked.pdf">inked</a>)</td></tr>
+  <tr><td>Apr 4</td><td><a href="/courses/cse484/25sp/slides/lecture3.pdf"></a></td></tr>
+  <tr><td>Apr 7</td><td><a href="https://cdn.example.edu/lecture4.pdf">Lecture&nbsp;4 &#8211; Crypto</a></td></tr>
+  <tr><td>Apr 9</td><td><a href="notes/lecture5.html">Lecture 5 notes</a> <a>no href</a></td></tr>
+  <tr><td>Apr 11</td><td><a href="slides/caf\u00e9.pdf">Caf\u00e9 \u2615 lecture</a></td></tr>
+</table>
+</body></html>
+"""
+
+PAGES = {
+    'https://courses.example.edu/cse484/': [
+        {'url': 'https://courses.example.edu/cse484/l1.pdf', 'name': 'Lecture 1'},
+        {'url': 'https://courses.example.edu/shared.pdf', 'name': 'Syllabus'},
+    ],
+    'https://courses.example.edu/cse451/': [
+        {'url': 'https://courses.example.edu/cse451/l1.pdf', 'name': 'Lecture 1'},
+        {'url': 'https://courses.example.edu/shared.pdf', 'name': 'Syllabus'},
+    ],
+}
+
+
+class CrawlNamingTest(unittest.TestCase):
+    def crawl(self, course_urls):
+        crawler = CourseCrawler(per_host_delay=0)
+        with mock.patch.object(CourseCrawler, '_scrape', lambda self, url, keyword: PAGES[url]):
+            return {slide['url']: slide['name'] for slide in crawler.crawl(course_urls)}
+
+    def test_adding_a_course_keeps_the_names_of_the_first(self):
+        alone = self.crawl(['https://courses.example.edu/cse484/'])
+        together = self.crawl(['https://courses.example.edu/cse484/', 'https://courses.example.edu/cse451/'])
+        for url, name in alone.items():
+            if url != 'https://courses.example.edu/shared.pdf':
+                self.assertEqual(together[url], name)
+
+    def test_same_link_text_on_two_courses_gets_two_names(self):
+        names = self.crawl(['https://courses.example.edu/cse484/', 'https://courses.example.edu/cse451/'])
+        self.assertNotEqual(names['https://courses.example.edu/cse484/l1.pdf'],
+                            names['https://courses.example.edu/cse451/l1.pdf'])
+
+    def test_shared_pdf_goes_to_the_course_whose_url_sorts_first(self):
+        forward = self.crawl(['https://courses.example.edu/cse484/', 'https://courses.example.edu/cse451/'])
+        backward = self.crawl(['https://courses.example.edu/cse451/', 'https://courses.example.edu/cse484/'])
+        self.assertEqual(forward, backward)
+        self.assertTrue(forward['https://courses.example.edu/shared.pdf'].endswith('cse451_Syllabus'))
+
+
+class LinkParserTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        # SlideScraper creates a slides/ download directory in the working directory
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def links(self, link_parser, page=SCHEDULE_PAGE):
+        return SlideScraper(COURSE_URL, link_parser=link_parser).extract_slide_links(page)
+
+    def test_soup_and_stream_parsers_find_the_same_links(self):
+        soup_links = self.links('soup')
+        self.assertEqual(len(soup_links), 6)
+        self.assertEqual(self.links('stream'), soup_links)
+
+    def test_streamed_response_split_inside_tags_matches_soup(self):
+        body = SCHEDULE_PAGE.encode('utf-8')
+
+        class Response(FakeResponse):
+            encoding = 'utf-8'
+
+            def iter_content(self, chunk_size=1, decode_unicode=False):
+                # Small chunks split tags, entities and link text across feeds; like requests,
+                # an incremental decoder keeps multi-byte characters whole
+                decoder = codecs.getincrementaldecoder(self.encoding)()
+                for i in range(0, len(body), 7):
+                    yield decoder.decode(body[i:i + 7]) if decode_unicode else body[i:i + 7]
+
+        session = mock.Mock()
+        session.get.return_value = Response(COURSE_URL, 200, {}, body)
+        scraper = SlideScraper(COURSE_URL, session=session, link_parser='stream')
+        self.assertEqual(scraper.fetch_links(), self.links('soup'))
+
+
+if __name__ == '__main__':
+    unittest.main()
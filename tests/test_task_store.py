@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_store import JournalTaskStore, open_task_store
+
+
+def entry(state: str, created_at: float) -> dict:
+    return {'task_id': None, 'url': 'https://x/a.pdf', 'state': state, 'created_at': created_at,
+            'progress': None, 'error_message': None, 'result': None}
+
+
+class SQLiteMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_file = os.path.join(self.tmp.name, 'result.json')
+        self.db_file = os.path.join(self.tmp.name, 'result.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_migrates_a_history_that_only_exists_as_a_journal(self):
+        store = JournalTaskStore(self.json_file)
+        for i in range(3):
+            store.put(f'task-{i}', entry('done', i))
+        store.close()
+        self.assertFalse(os.path.exists(self.json_file))
+
+        db = open_task_store(self.db_file)
+        self.assertEqual(sorted(db.load()), ['task-0', 'task-1', 'task-2'])
+        db.close()
+
+    def test_starts_empty_without_a_previous_history(self):
+        db = open_task_store(self.db_file)
+        self.assertEqual(db.load(), {})
+        db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import zipper
+from download_manifest import load_manifest
+from tests.fake_http import FakeFileServer, build_zip
+
+ZIP_URL = 'https://cdn.example.com/results/abc.zip'
+MEMBERS = {
+    'full.md': b'# Lecture 1\n' * 200,
+    'images/figure.jpg': os.urandom(20000),
+    'abc_content_list.json': b'[]',
+}
+
+
+class ResumableDownloadTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        sleep = mock.patch.object(zipper.time, 'sleep')
+        sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def download(self, server):
+        return zipper.download_and_extract_zip(ZIP_URL, 'lecture1', session=server, spool_max_size=0,
+                                               artifacts=None, skip_unchanged=False)
+
+    def assert_extracted(self, members):
+        for name, data in members.items():
+            with open(os.path.join('output', 'lecture1', name), 'rb') as f:
+                self.assertEqual(f.read(), data)
+
+    def partial_files(self):
+        partial_dir = os.path.join('output', zipper.PARTIAL_DIR_NAME)
+        return os.listdir(partial_dir) if os.path.isdir(partial_dir) else []
+
+    def test_resumes_after_a_dropped_connection(self):
+        server = FakeFileServer(build_zip(MEMBERS))
+        server.drops = [5000]
+
+        self.assertIsNotNone(self.download(server))
+
+        self.assertEqual(server.requests[1], {'Range': 'bytes=5000-', 'If-Range': '"v1"'})
+        self.assert_extracted(MEMBERS)
+        self.assertEqual(load_manifest(os.path.join('output', 'lecture1'))['etag'], '"v1"')
+
+    def test_resumes_a_partial_download_left_by_an_earlier_run(self):
+        server = FakeFileServer(build_zip(MEMBERS))
+        server.drops = [3000, 0, 0, 0]
+
+        self.assertIsNone(self.download(server))
+        self.assertEqual(len(self.partial_files()), 2)
+
+        server.requests = []
+        self.assertIsNotNone(self.download(server))
+
+        self.assertEqual(server.requests, [{'Range': 'bytes=3000-', 'If-Range': '"v1"'}])
+        self.assert_extracted(MEMBERS)
+        self.assertEqual(self.partial_files(), [])
+
+    def test_changed_etag_restarts_the_download(self):
+        server = FakeFileServer(build_zip(MEMBERS))
+        server.drops = [3000, 0, 0, 0]
+        self.assertIsNone(self.download(server))
+
+        changed = {**MEMBERS, 'full.md': b'# Lecture 1 (revised)\n' * 200}
+        server.body = build_zip(changed)
+        server.etag = '"v2"'
+        server.requests = []
+        self.assertIsNotNone(self.download(server))
+
+        # The stale If-Range makes the server send the new file whole
+        self.assertEqual(server.requests, [{'Range': 'bytes=3000-', 'If-Range': '"v1"'}])
+        self.assert_extracted(changed)
+        self.assertEqual(load_manifest(os.path.join('output', 'lecture1'))['etag'], '"v2"')
+        self.assertEqual(self.partial_files(), [])
+
+    def test_server_without_range_support_sends_the_whole_file_again(self):
+        server = FakeFileServer(build_zip(MEMBERS), ranges=False)
+        server.drops = [5000]
+
+        self.assertIsNotNone(self.download(server))
+
+        self.assertEqual(len(server.requests), 2)
+        self.assert_extracted(MEMBERS)
+
+
+if __name__ == '__main__':
+    unittest.main()
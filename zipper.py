@@ -1,10 +1,231 @@
 import requests
 import os
 import zipfile
+import tempfile
+import hashlib
+import json
+import shutil
+import time
 from urllib.parse import urlparse
 from pathlib import Path
+from http_session import get_shared_session
+from remote_zip import open_remote_file, RangeNotSupportedError
+from download_manifest import file_digest, is_up_to_date, write_manifest
 
-def download_and_extract_zip(zip_url, custom_base_name = None):
+# Download chunk size and in-memory spool limit before spilling to disk
+CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# Bytes read from the end of a remote ZIP up front; covers the central directory of typical results
+TAIL_PREFETCH_SIZE = 64 * 1024
+# Selected members separated by less than this many bytes are fetched in one Range request
+COALESCE_GAP = 32 * 1024
+
+# Partial downloads are kept in output/.partial so a later run can resume them
+PARTIAL_DIR_NAME = '.partial'
+DOWNLOAD_RETRIES = 3
+
+# Artifacts found in a MinerU result ZIP
+ARTIFACTS = ('markdown', 'images', 'content_list', 'layout', 'origin')
+DEFAULT_ARTIFACTS = ('markdown', 'images', 'content_list')
+
+def artifact_of(member_name):
+    """Get the artifact type of a ZIP member name, or None if it is not a known artifact"""
+    base_name = os.path.basename(member_name)
+    if member_name.startswith('images/'):
+        return 'images'
+    if base_name.endswith('.md'):
+        return 'markdown'
+    if base_name.endswith('_content_list.json'):
+        return 'content_list'
+    if base_name == 'layout.json':
+        return 'layout'
+    if base_name.endswith('_origin.pdf'):
+        return 'origin'
+    return None
+
+def select_members(infolist, artifacts = None):
+    """Select ZIP members belonging to the given artifacts (all members if artifacts is None)"""
+    if artifacts is None:
+        return list(infolist)
+    return [info for info in infolist if artifact_of(info.filename) in artifacts]
+
+def prefetch_members(remote, infolist, members, directory_start):
+    """Fetch the byte ranges of the selected members, merging neighbours into single requests"""
+    # A member's local header and data span up to the next member's header (or the central directory)
+    offsets = sorted(info.header_offset for info in infolist)
+    spans = []
+    for info in sorted(members, key=lambda info: info.header_offset):
+        index = offsets.index(info.header_offset)
+        end = offsets[index + 1] if index + 1 < len(offsets) else directory_start
+        end = max(end, info.header_offset + info.compress_size)
+        if spans and info.header_offset - spans[-1][1] <= COALESCE_GAP:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([info.header_offset, end])
+    
+    for start, end in spans:
+        remote.fetch(start, end)
+
+def extract_remote_members(zip_url, session, extract_dir, artifacts):
+    """
+    Extract selected artifacts from a remote ZIP using HTTP Range requests
+    
+    Only the central directory and the selected members are downloaded.
+    
+    Returns:
+        Tuple of (extracted files, response headers of the ZIP)
+    
+    Raises:
+        RangeNotSupportedError: If the server cannot serve byte ranges
+    """
+    remote = open_remote_file(zip_url, session)
+    remote.fetch(max(remote.size - TAIL_PREFETCH_SIZE, 0), remote.size)
+    
+    with zipfile.ZipFile(remote, 'r') as zip_ref:
+        infolist = zip_ref.infolist()
+        members = select_members(infolist, artifacts)
+        prefetch_members(remote, infolist, members, zip_ref.start_dir)
+        files = extract_verified(zip_ref, extract_dir, members)
+    
+    print(f"Fetched {remote.bytes_fetched / 1024:.0f} KB of {remote.size / 1024:.0f} KB "
+          f"in {remote.requests_made} range requests")
+    return files, remote.headers
+
+def extract_verified(zip_ref, extract_dir, members = None):
+    """
+    Extract members one by one, checking each file's CRC and size
+    
+    Returns:
+        Mapping of extracted file names to their size and sha256, for the download manifest
+    """
+    files = {}
+    for info in members if members is not None else zip_ref.infolist():
+        # ZipExtFile verifies the CRC once the member has been read to the end
+        target = zip_ref.extract(info, extract_dir)
+        if info.is_dir():
+            continue
+        if os.path.getsize(target) != info.file_size:
+            raise zipfile.BadZipFile(f"Size mismatch for {info.filename}")
+        files[info.filename] = {'size': info.file_size, 'sha256': file_digest(target)}
+    return files
+
+def partial_paths(output_dir, zip_url):
+    """Paths of the partial download and its metadata for a ZIP URL"""
+    partial_dir = Path(output_dir) / PARTIAL_DIR_NAME
+    key = hashlib.sha1(zip_url.encode('utf-8')).hexdigest()
+    return partial_dir / f"{key}.zip.part", partial_dir / f"{key}.json"
+
+def load_partial_meta(meta_path, zip_url):
+    """Load metadata of a partial download of zip_url, or None if there is none"""
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return meta if meta.get('url') == zip_url else None
+
+def save_partial(buffer, part_path, meta_path, meta):
+    """Persist the bytes downloaded so far and the validators needed to resume them"""
+    if buffer.tell() == 0:
+        return
+    part_path.parent.mkdir(exist_ok=True)
+    if getattr(buffer, 'name', None) != str(part_path):
+        buffer.seek(0)
+        with open(part_path, 'wb') as f:
+            shutil.copyfileobj(buffer, f)
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    print(f"Saved partial download ({os.path.getsize(part_path)} bytes) for resuming later")
+
+def discard_partial(part_path, meta_path):
+    """Remove a partial download and its metadata"""
+    for path in (part_path, meta_path):
+        if path.exists():
+            path.unlink()
+
+def fetch_resumable(session, zip_url, buffer, meta, retries = DOWNLOAD_RETRIES):
+    """
+    Append the rest of zip_url to buffer, resuming with Range requests after failures
+    
+    The buffer's current position is the number of bytes already held. Resumed
+    requests send If-Range with the recorded ETag (or Last-Modified), so a
+    changed file comes back whole and the buffer restarts from zero.
+    
+    Args:
+        session: Session used for the requests
+        zip_url: URL of the ZIP
+        buffer: Writable, seekable file positioned at the end of the data held so far
+        meta: Dict updated in place with ETag, Last-Modified and Content-Length
+        retries: Number of times to resume after a network error
+    """
+    for attempt in range(retries + 1):
+        offset = buffer.tell()
+        request_headers = {}
+        if offset:
+            request_headers['Range'] = f"bytes={offset}-"
+            validator = meta.get('ETag') or meta.get('Last-Modified')
+            if validator:
+                request_headers['If-Range'] = validator
+        
+        try:
+            response = session.get(zip_url, stream=True, headers=request_headers)
+            if response.status_code == 416 and offset:
+                if meta.get('Content-Length') is not None and offset == int(meta['Content-Length']):
+                    # Everything was already downloaded before the interruption
+                    return
+                print("Server rejected the resume range, restarting download")
+                buffer.seek(0)
+                buffer.truncate()
+                continue
+            response.raise_for_status()
+            
+            if response.status_code == 206:
+                # Content-Range: bytes start-end/total
+                total = response.headers.get('Content-Range', '').rpartition('/')[2]
+                if total.isdigit():
+                    meta['Content-Length'] = total
+            else:
+                if offset:
+                    print("Server sent the whole file, restarting download")
+                    buffer.seek(0)
+                    buffer.truncate()
+                meta['Content-Length'] = response.headers.get('Content-Length')
+                meta['ETag'] = response.headers.get('ETag')
+                meta['Last-Modified'] = response.headers.get('Last-Modified')
+            
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                buffer.write(chunk)
+            
+            if meta.get('Content-Length') is not None and buffer.tell() < int(meta['Content-Length']):
+                raise requests.exceptions.ConnectionError(
+                    f"Connection closed after {buffer.tell()} of {meta['Content-Length']} bytes"
+                )
+            return
+        
+        except requests.exceptions.RequestException as e:
+            if attempt == retries or (isinstance(e, requests.exceptions.HTTPError)
+                                      and e.response is not None and e.response.status_code < 500):
+                raise
+            delay = 2 ** attempt
+            print(f"Download interrupted at byte {buffer.tell()} ({e}), resuming in {delay}s...")
+            time.sleep(delay)
+
+def download_and_extract_zip(zip_url, custom_base_name = None, session = None, spool_max_size = SPOOL_MAX_SIZE,
+                             artifacts = None, skip_unchanged = True, revalidate = False, verify_hashes = False):
+    """
+    Download a result ZIP and extract it to output/<name>
+    
+    When artifacts is given (a subset of ARTIFACTS), only those members are
+    fetched using HTTP Range requests, falling back to a full download if the
+    server does not support ranges. None extracts everything.
+    
+    Each extraction writes a download manifest; with skip_unchanged, a
+    directory whose manifest matches the URL and whose files are intact is
+    left alone (revalidate confirms with a conditional request first, and
+    verify_hashes compares each file's sha256 with the manifest instead of
+    only its size).
+    """
     # Create output directory if it doesn't exist
     output_dir = Path('output')
     output_dir.mkdir(exist_ok=True)
@@ -19,35 +240,77 @@ def download_and_extract_zip(zip_url, custom_base_name = None):
     else:
         # Create specific directory for this zip
         extract_dir = output_dir / base_name
-    extract_dir.mkdir(exist_ok=True)
     
     try:
-        # Download the zip file
-        print(f"Downloading {zip_url}...")
-        response = requests.get(zip_url, stream=True)
-        response.raise_for_status()
+        extract_dir.mkdir(exist_ok=True)
+        session = session or get_shared_session()
+        
+        if skip_unchanged and is_up_to_date(zip_url, extract_dir, artifacts, session, revalidate, verify_hashes):
+            print(f"Already up to date: {extract_dir}")
+            return extract_dir
         
-        # Save zip file temporarily
-        temp_zip = output_dir / zip_filename
-        with open(temp_zip, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        if artifacts is not None:
+            try:
+                print(f"Fetching {', '.join(artifacts)} from {zip_url}...")
+                files, headers = extract_remote_members(zip_url, session, extract_dir, artifacts)
+                write_manifest(extract_dir, zip_url, headers, artifacts, files)
+                print(f"Successfully extracted to {extract_dir}")
+                return extract_dir
+            except RangeNotSupportedError as e:
+                print(f"Range requests unavailable ({e}), downloading the full ZIP")
         
-        # Extract the zip file
-        print(f"Extracting to {extract_dir}...")
-        with zipfile.ZipFile(temp_zip, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
+        # Download the zip file, resuming a partial download left by an earlier run
+        part_path, meta_path = partial_paths(output_dir, zip_url)
+        meta = load_partial_meta(meta_path, zip_url)
+        resumed = meta is not None and part_path.exists()
+        if resumed:
+            # Resume into the partial file on disk
+            buffer = open(part_path, 'r+b')
+            buffer.seek(0, os.SEEK_END)
+            print(f"Resuming {zip_url} from byte {buffer.tell()}...")
+        else:
+            # Spool the zip in memory, spilling to a temporary file only above the threshold
+            buffer = tempfile.SpooledTemporaryFile(max_size=spool_max_size, dir=output_dir)
+            meta = {'url': zip_url}
+            print(f"Downloading {zip_url}...")
         
-        # Remove the temporary zip file
-        temp_zip.unlink()
+        with buffer:
+            try:
+                fetch_resumable(session, zip_url, buffer, meta)
+            except requests.exceptions.RequestException:
+                # Keep what we have so the next run can continue with a Range request
+                save_partial(buffer, part_path, meta_path, meta)
+                raise
+            
+            if meta.get('Content-Length') is not None and buffer.tell() != int(meta['Content-Length']):
+                discard_partial(part_path, meta_path)
+                raise zipfile.BadZipFile(f"Incomplete download: got {buffer.tell()} of {meta['Content-Length']} bytes")
+            
+            buffer.seek(0)
+            try:
+                with zipfile.ZipFile(buffer, 'r') as zip_ref:
+                    # A resumed download was stitched from several responses, so check every CRC first
+                    if resumed:
+                        bad_member = zip_ref.testzip()
+                        if bad_member is not None:
+                            raise zipfile.BadZipFile(f"CRC check failed for {bad_member} after resuming")
+                    
+                    # Extract the zip file straight from the buffer
+                    print(f"Extracting to {extract_dir}...")
+                    files = extract_verified(zip_ref, extract_dir, select_members(zip_ref.infolist(), artifacts))
+            except zipfile.BadZipFile:
+                discard_partial(part_path, meta_path)
+                raise
         
+        discard_partial(part_path, meta_path)
+        write_manifest(extract_dir, zip_url, meta, artifacts, files)
         print(f"Successfully extracted to {extract_dir}")
         return extract_dir
         
     except requests.exceptions.RequestException as e:
         print(f"Error downloading the file: {e}")
-    except zipfile.BadZipFile:
-        print("Error: The file is not a valid ZIP file")
+    except zipfile.BadZipFile as e:
+        print(f"Error: The file is not a valid ZIP file ({e})")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 